@@ -0,0 +1 @@
+"""Data loading and aggregation helpers for the tour insights dashboard notebook."""
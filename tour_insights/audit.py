@@ -0,0 +1,120 @@
+"""Audits of booking rows: availability containment and guide double bookings."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.guides import booked_slots_frame, day_numbers
+from tour_insights.timeline import cell_day_keys, find_overlaps
+
+# Containment of a booking's tour time in the guide's availability that day
+AUDIT_STATUSES = ["contained", "partial", "outside", "unknown_tour"]
+
+
+def booking_times(star, bookings, month=None):
+    """
+    Return `(month_codes, starts, ends)` of booking rows, with the tour's
+    TimeStart/TimeEnd looked up positionally (-1 for unknown tours). Rows
+    of the star's facts carry `month` and TourRow; a streamed chunk needs
+    its `month`.
+    """
+    if "month" in bookings.columns:
+        month_codes = bookings["month"].cat.codes.to_numpy().astype(np.int64)
+    else:
+        month_codes = np.full(len(bookings), star.months.index(month), dtype=np.int64)
+    if "TourRow" in bookings.columns:
+        rows = bookings["TourRow"].to_numpy()
+    else:
+        rows = star.rows("tours", month, bookings["TourID"])
+
+    tours = star.dimensions["tours"]
+    known = rows >= 0
+    starts = np.full(len(bookings), -1, dtype=np.int64)
+    ends = np.full(len(bookings), -1, dtype=np.int64)
+    starts[known] = tours["TimeStart"].to_numpy()[rows[known]]
+    ends[known] = tours["TimeEnd"].to_numpy()[rows[known]]
+    return month_codes, starts, ends
+
+
+def audit_bookings(star, availability, bookings, month=None):
+    """
+    Classify every booking against an IntervalIndex of availability ranges
+    keyed by (month, GuideID, day):
+
+    - contained: the tour time lies inside the guide's availability
+    - partial: only part of the tour time is covered
+    - outside: no minute is covered, including days without availability
+    - unknown_tour: the TourID has no tour row, so there is no time to check
+
+    Returns one row per booking with CoveredMinutes, HasAvailability and Status.
+    """
+    month_codes, starts, ends = booking_times(star, bookings, month)
+    guide_ids = bookings["GuideID"].to_numpy().astype(np.int64)
+    n_ids = star.lookups["guides"].shape[1]
+    known_guide = (guide_ids >= 0) & (guide_ids < n_ids)
+
+    # Unknown guides get a key no availability range can have
+    keys = np.where(
+        known_guide,
+        cell_day_keys(month_codes, np.clip(guide_ids, 0, n_ids - 1), day_numbers(bookings["BookingDate"]), n_ids),
+        -1,
+    )
+    covered = availability.overlap(keys, starts, ends)
+    duration = ends - starts
+
+    status = np.select(
+        [starts < 0, covered >= duration, covered > 0],
+        [3, 0, 1],
+        default=2,
+    )
+    return pd.DataFrame(
+        {
+            "month": pd.Categorical.from_codes(month_codes, categories=star.months),
+            "id": bookings["id"].to_numpy(),
+            "GuideID": guide_ids,
+            "BookingDate": bookings["BookingDate"].to_numpy(),
+            "TourID": bookings["TourID"].to_numpy(),
+            "TimeStart": starts,
+            "TimeEnd": ends,
+            "CoveredMinutes": covered,
+            "HasAvailability": availability.count(keys) > 0,
+            "Status": pd.Categorical.from_codes(status, categories=AUDIT_STATUSES),
+        }
+    )
+
+
+def double_bookings(star, booking_stats):
+    """
+    Find guides booked on two overlapping tours at the same time. The
+    distinct booked (GuideID, day, TourID) slots are swept per guide-day, so
+    several bookings of the same tour are one slot, not a conflict.
+
+    Returns one row per conflicting slot with the earlier overlapping tour
+    (ConflictTourID, ConflictStart, ConflictEnd) and the OverlapMinutes.
+    """
+    slots = booked_slots_frame(star, booking_stats)
+    keys = cell_day_keys(
+        slots["month"].cat.codes.to_numpy(),
+        slots["GuideID"].to_numpy(),
+        day_numbers(slots["BookingDate"]),
+        star.lookups["guides"].shape[1],
+    )
+    rows, blockers, minutes = find_overlaps(keys, slots["TimeStart"], slots["TimeEnd"])
+
+    conflicts = slots.iloc[rows].reset_index(drop=True)
+    blocking = slots.iloc[blockers].reset_index(drop=True)
+    conflicts["ConflictTourID"] = blocking["TourID"]
+    conflicts["ConflictStart"] = blocking["TimeStart"]
+    conflicts["ConflictEnd"] = blocking["TimeEnd"]
+    conflicts["OverlapMinutes"] = minutes
+    return conflicts.sort_values(["month", "GuideID", "BookingDate", "TimeStart"], kind="stable").reset_index(drop=True)
+
+
+def export_frame(df, path):
+    """Write a report frame to CSV, creating its folder, and return the path."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    df.to_csv(path, index=False)
+    return path
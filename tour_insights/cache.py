@@ -0,0 +1,116 @@
+"""Persistent on-disk cache for parsed monthly datasets."""
+
+import hashlib
+import importlib.util
+import json
+import os
+
+import pandas as pd
+
+# Bump whenever parsing or normalization changes so stale cache entries are rebuilt
+CACHE_VERSION = 3
+
+# Parquet keeps the cache columnar and typed; pickle is used when pyarrow is missing
+CACHE_FORMAT = "parquet" if importlib.util.find_spec("pyarrow") else "pickle"
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    Stores each parsed dataset next to a small JSON manifest describing the
+    source CSV (size, mtime and content hash).
+
+    A cached frame is reused when the size and mtime still match. If only the
+    mtime changed (file touched or copied), the content hash decides, so an
+    unchanged file is never re-parsed and an edited file always is.
+    """
+
+    def __init__(self, cache_dir: str = ".cache", version: int = CACHE_VERSION):
+        self.cache_dir = cache_dir
+        self.version = version
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, source):
+        name = os.path.splitext(os.path.basename(source))[0]
+        extension = "parquet" if CACHE_FORMAT == "parquet" else "pkl"
+        return (
+            os.path.join(self.cache_dir, f"{name}.json"),
+            os.path.join(self.cache_dir, f"{name}.{extension}"),
+        )
+
+    def _read_manifest(self, manifest_path):
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, manifest_path, entry):
+        tmp_path = f"{manifest_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=1)
+        os.replace(tmp_path, manifest_path)
+
+    def _read_frame(self, data_path):
+        if CACHE_FORMAT == "parquet":
+            return pd.read_parquet(data_path)
+        return pd.read_pickle(data_path)
+
+    def _write_frame(self, data_path, df):
+        tmp_path = f"{data_path}.tmp{os.getpid()}"
+        if CACHE_FORMAT == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, data_path)
+
+    def load(self, source: str, reader):
+        """
+        Return the parsed frame for `source`, calling `reader()` only when the
+        cache entry is missing, stale or was built by another cache version.
+        """
+        stat = os.stat(source)
+        manifest_path, data_path = self._paths(source)
+        entry = self._read_manifest(manifest_path)
+
+        usable = (
+            entry is not None
+            and entry.get("version") == self.version
+            and entry.get("format") == CACHE_FORMAT
+            and entry.get("source") == os.path.abspath(source)
+            and os.path.exists(data_path)
+        )
+
+        # Fast path: nothing about the file changed since it was cached
+        if usable and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return self._read_frame(data_path)
+
+        digest = file_digest(source)
+        if usable and entry["sha256"] == digest:
+            # Same content under a new mtime: refresh the manifest only
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._write_manifest(manifest_path, entry)
+            return self._read_frame(data_path)
+
+        df = reader()
+        self._write_frame(data_path, df)
+        self._write_manifest(
+            manifest_path,
+            {
+                "source": os.path.abspath(source),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest,
+                "version": self.version,
+                "format": CACHE_FORMAT,
+            },
+        )
+        return df
@@ -0,0 +1,91 @@
+"""Shared categorical dictionaries for the low-cardinality text columns."""
+
+import numpy as np
+import pandas as pd
+
+# Free-text columns whose formatting is standardized across all datasets
+CATEGORICAL_COLUMNS = [
+    "GuideName",
+    "GuideLocation",
+    "TourName",
+    "TourLocation",
+]
+
+
+def normalize_labels(labels) -> pd.Index:
+    """Strip stray quotes/spaces and title-case each label."""
+    return pd.Index(labels, dtype=object).astype(str).str.strip("'\" ").str.title()
+
+
+def to_normalized_categorical(series) -> pd.Series:
+    """
+    Normalize a text column once per distinct value instead of once per row,
+    and return it as a Categorical holding the normalized labels.
+
+    Missing values are normalized like any other value ("Nan"), which matches
+    the previous row-wise `.astype(str)` behaviour.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        raw_labels = series.cat.categories
+    else:
+        codes, raw_labels = pd.factorize(series, use_na_sentinel=False)
+
+    # Different raw spellings can collapse to the same normalized label
+    remap, labels = pd.factorize(normalize_labels(raw_labels))
+    codes = np.where(codes >= 0, remap[codes], -1) if len(remap) else codes
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=labels),
+        index=series.index,
+        name=series.name,
+    )
+
+
+class CategoryRegistry:
+    """
+    Append-only label dictionary per column, shared by every loaded month.
+
+    Codes are never reassigned, so a frame encoded earlier keeps valid codes
+    and only needs its category list extended to match later months.
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._categories = {}
+
+    def categories(self, column: str) -> pd.Index:
+        """Return every label seen so far for a column, in code order."""
+        if column not in self._categories:
+            self._categories[column] = pd.Index(list(self._codes.get(column, {})), dtype=object)
+        return self._categories[column]
+
+    def encode(self, column: str, series) -> pd.Series:
+        """Return `series` as a Categorical using the shared dictionary of `column`."""
+        local = to_normalized_categorical(series)
+        lookup = self._codes.setdefault(column, {})
+        size = len(lookup)
+        mapping = np.array(
+            [lookup.setdefault(label, len(lookup)) for label in local.cat.categories],
+            dtype=np.int32,
+        )
+        if len(lookup) != size:
+            self._categories.pop(column, None)
+
+        codes = local.cat.codes.to_numpy()
+        shared_codes = np.where(codes >= 0, mapping[codes], -1) if len(mapping) else codes
+        return pd.Series(
+            pd.Categorical.from_codes(shared_codes, categories=self.categories(column)),
+            index=series.index,
+            name=series.name,
+        )
+
+    def conform(self, df):
+        """Re-encode the categorical columns of `df` in place onto the shared dictionaries."""
+        for column in CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = self.encode(column, df[column])
+        return df
+
+
+# Dictionary shared by every frame loaded in this process
+SHARED_CATEGORIES = CategoryRegistry()
@@ -0,0 +1,101 @@
+"""Comparisons of a keyed metric across any number of months."""
+
+import numpy as np
+import pandas as pd
+
+
+class MonthComparison:
+    """
+    A metric per entity (guide, tour, location, ...) and month: `keys` holds
+    one row per entity and `values` the (n_entities, n_months) matrix, 0
+    where an entity is absent from a month. Totals and month-over-month
+    deltas are array operations on the matrix.
+    """
+
+    def __init__(self, keys, values, months):
+        self.keys = keys.reset_index(drop=True)
+        self.values = values
+        self.months = list(months)
+
+    @classmethod
+    def from_frames(cls, frames, keys, value: str):
+        """
+        Build from `{month: frame}` with the key columns and `value`, in the
+        order of `frames`. The months are concatenated once, the keys are
+        factorized into int codes and the matrix is filled by one bincount,
+        so the cost grows linearly with the number of months. Missing keys
+        stay missing, and integer values stay integers.
+        """
+        months = list(frames)
+        keys = list(keys)
+        long = pd.concat(
+            [frames[m][[*keys, value]].assign(_month=code) for code, m in enumerate(months)],
+            ignore_index=True,
+        )
+        # Category sets differ between months: recode each month onto their union
+        for k in keys:
+            if all(isinstance(frames[m][k].dtype, pd.CategoricalDtype) for m in months):
+                long[k] = _union_categorical([frames[m][k] for m in months])
+
+        key_codes = np.stack([_key_codes(long[k]) for k in keys], axis=1)
+        _, first, codes = np.unique(key_codes, axis=0, return_index=True, return_inverse=True)
+        codes = codes.reshape(-1)
+        values = np.bincount(
+            codes * len(months) + long["_month"].to_numpy(),
+            weights=long[value].to_numpy(dtype=np.float64),
+            minlength=len(first) * len(months),
+        ).reshape(len(first), len(months))
+        if all(pd.api.types.is_integer_dtype(frames[m][value].dtype) for m in months):
+            values = values.astype(np.int64)
+        return cls(long[keys].iloc[first], values, months)
+
+    def totals(self) -> np.ndarray:
+        """Sum of every entity over the months."""
+        return self.values.sum(axis=1)
+
+    def deltas(self) -> np.ndarray:
+        """Change of every entity from each month to the next, (n_entities, n_months - 1)."""
+        return np.diff(self.values, axis=1)
+
+    def order(self, ascending: bool = False) -> np.ndarray:
+        """Entity positions sorted by total (stable on ties)."""
+        totals = self.totals()
+        return np.argsort(totals if ascending else -totals, kind="stable")
+
+    def table(self, labels=None, deltas: bool = False) -> pd.DataFrame:
+        """
+        Wide frame: the keys, one column per month (named by `labels`, a
+        {month: label} mapping), Total and, with `deltas`, one change column
+        per consecutive pair of months.
+        """
+        labels = labels or {}
+        names = [labels.get(m, m) for m in self.months]
+        table = pd.concat([self.keys, pd.DataFrame(self.values, columns=names)], axis=1)
+        table["Total"] = self.totals()
+        if deltas:
+            changes = self.deltas()
+            for i in range(changes.shape[1]):
+                table[f"{names[i]} → {names[i + 1]}"] = changes[:, i]
+        return table
+
+
+def _union_categorical(columns) -> pd.Categorical:
+    """Concatenate categorical columns onto their sorted union of categories, remapping codes only."""
+    categories = pd.Index([])
+    for column in columns:
+        categories = categories.union(column.cat.categories)
+    parts = []
+    for column in columns:
+        # Missing values (code -1) pick the trailing -1
+        remap = np.append(categories.get_indexer(column.cat.categories), -1)
+        parts.append(remap[column.cat.codes.to_numpy()])
+    codes = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _key_codes(column) -> np.ndarray:
+    """Sortable int codes of a key column, -1 for missing keys."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy().astype(np.int64)
+    codes, _ = pd.factorize(column, sort=True)
+    return codes.astype(np.int64)
@@ -0,0 +1,153 @@
+"""Daily booking counts over the full date span with prefix sums for range queries."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.guides import day_numbers
+
+
+class PrefixCounts:
+    """
+    Counts per (row, day) over a growing span of days, with cumulative sums
+    along the days so the total of any row over any range is two lookups.
+    Rows and days live in buffers whose capacity doubles when it runs out, and
+    adding counts only recomputes the prefix sums from the earliest day added.
+    """
+
+    def __init__(self):
+        self.first_day = 0
+        self.n_rows = 0
+        self.n_days = 0
+        self._counts = np.zeros((0, 0), dtype=np.int64)
+        self._cumulative = np.zeros((0, 1), dtype=np.int64)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts[: self.n_rows, : self.n_days]
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        return self._cumulative[: self.n_rows, : self.n_days + 1]
+
+    def _grow(self, n_rows: int, first_day: int, last_day: int):
+        """
+        Extend the rows and the day span (before or after) to cover the given
+        bounds. Appending reuses spare capacity; days before the span shift
+        the buffers, so every prefix sum is recomputed after them.
+        """
+        if self.n_days == 0:
+            self.first_day = first_day
+        before = max(self.first_day - first_day, 0)
+        n_days = max(last_day - self.first_day + 1, self.n_days) + before
+        n_rows = max(n_rows, self.n_rows)
+        row_capacity, day_capacity = self._counts.shape
+        if before or n_rows > row_capacity or n_days > day_capacity:
+            shape = (
+                max(n_rows, 2 * row_capacity) if n_rows > row_capacity else row_capacity,
+                max(n_days, 2 * day_capacity) if n_days > day_capacity else day_capacity,
+            )
+            counts = np.zeros(shape, dtype=np.int64)
+            counts[: self.n_rows, before : before + self.n_days] = self.counts
+            cumulative = np.zeros((shape[0], shape[1] + 1), dtype=np.int64)
+            if not before:
+                cumulative[: self.n_rows, : self.n_days + 1] = self.cumulative
+            self._counts, self._cumulative = counts, cumulative
+        self.first_day -= before
+        self.n_rows, self.n_days = n_rows, n_days
+
+    def add(self, rows, days, counts):
+        """Add `counts` at each (row, day number)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        if len(rows) == 0:
+            return self
+        previous_days = self.n_days
+        self._grow(int(rows.max()) + 1, int(days.min()), int(days.max()))
+        columns = days - self.first_day
+        low, high = int(columns.min()), int(columns.max()) + 1
+        width = high - low
+        added = np.bincount(
+            rows * width + (columns - low), weights=counts, minlength=self.n_rows * width
+        ).astype(np.int64)
+        self._counts[: self.n_rows, low:high] += added.reshape(self.n_rows, width)
+
+        # Days appended past the previous span start at the old running total
+        low = min(low, previous_days)
+        cumulative = self.cumulative
+        cumulative[:, low + 1 :] = cumulative[:, low : low + 1] + np.cumsum(self.counts[:, low:], axis=1)
+        return self
+
+    def columns(self, start_day, end_day):
+        """Prefix-sum columns [low, high) of the inclusive day range, clipped to the span."""
+        low = 0 if start_day is None else int(np.clip(start_day - self.first_day, 0, self.n_days))
+        high = self.n_days if end_day is None else int(np.clip(end_day - self.first_day + 1, 0, self.n_days))
+        return low, max(low, high)
+
+    def range_sum(self, start_day=None, end_day=None) -> np.ndarray:
+        """Total of every row between two day numbers, inclusive."""
+        low, high = self.columns(start_day, end_day)
+        return self.cumulative[:, high] - self.cumulative[:, low]
+
+
+def _day(date):
+    """Day number of a date-like value, or None."""
+    return None if date is None else int(day_numbers([pd.Timestamp(date)])[0])
+
+
+class DailyBookingIndex:
+    """
+    Bookings per day over the full date span of the loaded months: in total,
+    per TourID and per TourLocation. Bookings over any date range (a week,
+    a season, a year-over-year window) are prefix-sum lookups instead of
+    rescans, and a new month's bookings are added incrementally.
+    """
+
+    def __init__(self):
+        self._total = PrefixCounts()
+        self._tours = PrefixCounts()
+        self._locations = PrefixCounts()
+        self.locations = []
+
+    def add_month(self, star, month: str, aggregates):
+        """Add a month's per (TourID, day) booking counts; locations come from the month's tours."""
+        tour_ids, days, counts = aggregates.tour_day_bookings()
+        self._total.add(np.zeros(len(days), dtype=np.int64), days, counts)
+        known = tour_ids >= 0
+        self._tours.add(tour_ids[known], days[known], counts[known])
+
+        rows = star.rows("tours", month, tour_ids)
+        names = star.dimensions["tours"]["TourLocation"].reindex(rows).to_numpy()
+        located = pd.notna(names)
+        for name in pd.unique(names[located]):
+            if name not in self.locations:
+                self.locations.append(name)
+        positions = pd.Index(self.locations).get_indexer(names[located])
+        self._locations.add(positions, days[located], counts[located])
+        return self
+
+    def bookings(self, start=None, end=None) -> int:
+        """Bookings between two dates, inclusive (default: the full span)."""
+        totals = self._total.range_sum(_day(start), _day(end))
+        return int(totals[0]) if len(totals) else 0
+
+    def tour_bookings(self, start=None, end=None) -> pd.Series:
+        """Bookings per TourID between two dates, inclusive."""
+        totals = self._tours.range_sum(_day(start), _day(end))
+        return pd.Series(totals, name="count").rename_axis("TourID")
+
+    def location_bookings(self, start=None, end=None) -> pd.Series:
+        """Bookings per TourLocation between two dates, inclusive."""
+        totals = self._locations.range_sum(_day(start), _day(end))
+        return pd.Series(totals, index=pd.Index(self.locations, name="TourLocation"), name="count")
+
+    def daily(self, start=None, end=None) -> pd.Series:
+        """Bookings per date between two dates, inclusive, including days without bookings."""
+        low, high = self._total.columns(_day(start), _day(end))
+        if self._total.counts.shape[0] == 0:
+            return pd.Series(dtype="int64", name="count").rename_axis("BookingDate")
+        days = np.arange(self._total.first_day + low, self._total.first_day + high)
+        return pd.Series(
+            self._total.counts[0, low:high],
+            index=pd.DatetimeIndex(days.astype("datetime64[D]").astype("datetime64[ns]"), name="BookingDate"),
+            name="count",
+        )
@@ -0,0 +1,87 @@
+"""Per-guide day calendars stored as 31-bit masks (bit d-1 set = day d of the month)."""
+
+import numpy as np
+
+# Number of set bits of every byte value, for popcount without np.bitwise_count (numpy < 2)
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(masks) -> np.ndarray:
+    """Number of set bits of every uint32 mask."""
+    masks = np.ascontiguousarray(masks, dtype=np.uint32)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).astype(np.int64)
+    return _BYTE_POPCOUNT[masks.view(np.uint8)].reshape(*masks.shape, 4).sum(axis=-1, dtype=np.int64)
+
+
+def full_masks(days_in_month) -> np.ndarray:
+    """Mask with one bit per day of the month set, for each month."""
+    days = np.asarray(days_in_month, dtype=np.uint64)
+    return ((np.uint64(1) << days) - np.uint64(1)).astype(np.uint32)
+
+
+def day_masks(month_codes, keys, n_months: int, n_ids: int) -> np.ndarray:
+    """
+    Fold `GuideID << 32 | day` keys of all months into an (n_months, n_ids)
+    uint32 array of day masks. Keys of unknown guides are ignored.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    guide_ids = keys >> 32
+    known = (guide_ids >= 0) & (guide_ids < n_ids)
+    days = (keys[known] & 0xFFFFFFFF).astype("datetime64[D]")
+    day_of_month = (days - days.astype("datetime64[M]")).astype(np.int64)
+
+    masks = np.zeros(n_months * n_ids, dtype=np.uint32)
+    cells = np.asarray(month_codes, dtype=np.int64)[known] * n_ids + guide_ids[known]
+    np.bitwise_or.at(masks, cells, (np.uint32(1) << day_of_month.astype(np.uint32)))
+    return masks.reshape(n_months, n_ids)
+
+
+class GuideCalendar:
+    """
+    Available and booked days of every guide in every month, as uint32 day
+    masks indexed by [month, GuideID]. Day counts are popcounts and calendar
+    overlaps are bitwise operations, so each metric costs O(months x guides)
+    integer operations regardless of how many rows produced the masks.
+    """
+
+    def __init__(self, available, booked, days_in_month):
+        self.available = available
+        self.booked = booked
+        self.full = full_masks(days_in_month)[:, None]
+
+    @classmethod
+    def from_keys(cls, available, booked, days_in_month, n_ids: int):
+        """Build from `(month_codes, guide_day_keys)` pairs of available and booked days."""
+        n_months = len(days_in_month)
+        return cls(
+            day_masks(*available, n_months, n_ids),
+            day_masks(*booked, n_months, n_ids),
+            days_in_month,
+        )
+
+    def merge(self, other):
+        """Union with the calendar of another file or chunk of the same months."""
+        n_ids = max(self.available.shape[1], other.available.shape[1])
+
+        def widen(masks):
+            return np.pad(masks, ((0, 0), (0, n_ids - masks.shape[1])))
+
+        self.available = widen(self.available) | widen(other.available)
+        self.booked = widen(self.booked) | widen(other.booked)
+        return self
+
+    @property
+    def not_available(self):
+        """Days of the month without availability."""
+        return ~self.available & self.full
+
+    @property
+    def booked_unavailable(self):
+        """Days with bookings but no availability."""
+        return self.booked & ~self.available
+
+    @property
+    def available_idle(self):
+        """Days with availability but no bookings."""
+        return self.available & ~self.booked
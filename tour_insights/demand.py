@@ -0,0 +1,41 @@
+"""Booking demand profiles over the week, bucketed with one bincount."""
+
+import numpy as np
+
+from tour_insights.weekdays import weekday_numbers
+
+# Axis sizes of a weekday × hour profile
+WEEKDAYS, HOURS = 7, 24
+
+
+def weekday_hour_counts(star, booking_stats) -> np.ndarray:
+    """
+    Bookings per (month, TourLocation, weekday, start hour) as an array of
+    shape (n_months, n_locations, 7, 24), counted with a single bincount over
+    one combined index. Weekday 0 is Monday, the hour is the tour's TimeStart
+    hour, and the location axis follows the categories of the tours
+    dimension's TourLocation. Works from the per (TourID, day) booking
+    counts, so streamed months are profiled too; unknown tours are left out.
+    """
+    tours = star.dimensions["tours"]
+    locations = tours["TourLocation"].cat.codes.to_numpy().astype(np.int64)
+    hours = tours["TimeStart"].to_numpy().astype(np.int64) // 60
+    n_locations = len(tours["TourLocation"].cat.categories)
+
+    index, weights = [], []
+    for code, month in enumerate(star.months):
+        tour_ids, days, counts = booking_stats[month].tour_day_bookings()
+        rows = star.rows("tours", month, tour_ids)
+        keep = rows >= 0
+        keep[keep] = locations[rows[keep]] >= 0
+        rows = rows[keep]
+
+        cells = (code * n_locations + locations[rows]) * WEEKDAYS + weekday_numbers(days[keep])
+        index.append(cells * HOURS + hours[rows])
+        weights.append(counts[keep])
+
+    shape = (len(star.months), n_locations, WEEKDAYS, HOURS)
+    totals = np.bincount(
+        np.concatenate(index), weights=np.concatenate(weights), minlength=int(np.prod(shape))
+    )
+    return totals.astype(np.int64).reshape(shape)
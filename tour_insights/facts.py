@@ -0,0 +1,161 @@
+"""Integer-keyed star schema: month-partitioned fact tables over deduplicated dimensions."""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from tour_insights.intervals import parse_intervals
+from tour_insights.operating import OperatingCalendar
+from tour_insights.schema import WEEKDAY_COLUMNS
+from tour_insights.weekdays import WEEKDAY_MASK, pack_weekdays
+
+# Id column of each fact table pointing at each dimension
+DIMENSION_IDS = {"tours": "TourID", "guides": "GuideID"}
+
+# Column holding the dimension row index of each fact
+DIMENSION_ROWS = {"tours": "TourRow", "guides": "GuideRow"}
+
+
+def concat_months(frames, months):
+    """
+    Concatenate per-month frames in month order with a categorical `month` column.
+    Categorical columns are unioned instead of falling back to object dtype.
+    """
+    frames = [frames[m] for m in months]
+    sizes = [len(df) for df in frames]
+    categorical = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+
+    combined = pd.concat([df.drop(columns=categorical) for df in frames], ignore_index=True)
+    for column in categorical:
+        combined[column] = union_categoricals([df[column] for df in frames])
+    combined.insert(
+        0,
+        "month",
+        pd.Categorical.from_codes(np.repeat(np.arange(len(months)), sizes), categories=list(months)),
+    )
+    return combined[["month", *frames[0].columns]], np.concatenate([[0], np.cumsum(sizes)])
+
+
+class StarSchema:
+    """
+    One concatenated table per fact dataset (bookings, availability, skills)
+    with a `month` partition column and TourRow/GuideRow positions into
+    deduplicated tour and guide dimension tables.
+
+    Dimensions hold one row per distinct version of a tour or guide across all
+    months. `lookups[dimension]` is a (month, id) -> row array, so joining a
+    fact to its dimension is a positional `take` rather than a hash join.
+    """
+
+    def __init__(self, months, facts, offsets, dimensions, lookups):
+        self.months = list(months)
+        self.facts = facts
+        self.offsets = offsets
+        self.dimensions = dimensions
+        self.lookups = lookups
+        self._intervals = {}
+        self._calendars = {}
+
+    def slice(self, dataset: str, month: str):
+        """Return the facts of one month (a contiguous slice, not a copy)."""
+        start, stop = self.offsets[dataset][self.months.index(month)]
+        return self.facts[dataset].iloc[start:stop]
+
+    def intervals(self, dataset: str, column: str, month=None):
+        """
+        Time ranges of a column such as GuideAvailability as CSR Intervals,
+        parsed once for all months and cached with the facts. With `month`,
+        return that month's rows only.
+        """
+        if (dataset, column) not in self._intervals:
+            self._intervals[dataset, column] = parse_intervals(self.facts[dataset][column])
+        intervals = self._intervals[dataset, column]
+        if month is None:
+            return intervals
+        return intervals.slice(*self.offsets[dataset][self.months.index(month)])
+
+    def operating_calendar(self, year: int) -> OperatingCalendar:
+        """
+        The operating calendar (tour × day of its month) of every month, expanded from the
+        tours' weekday flags once and cached with the schema.
+        """
+        if year not in self._calendars:
+            self._calendars[year] = OperatingCalendar(self.monthly_dimension("tours"), self.months, year)
+        return self._calendars[year]
+
+    def rows(self, dimension: str, month: str, ids):
+        """Map ids of a month to dimension row positions (-1 when unknown)."""
+        lookup = self.lookups[dimension][self.months.index(month)]
+        ids = np.asarray(ids, dtype=np.int64)
+        known = (ids >= 0) & (ids < len(lookup))
+        return np.where(known, lookup[np.clip(ids, 0, len(lookup) - 1)], -1).astype(np.int32)
+
+    def monthly_dimension(self, dimension: str):
+        """
+        Return the dimension rows used by every month as one table with a
+        `month` column, in (month, id) order, taken in a single step.
+        """
+        lookup = self.lookups[dimension]
+        month_codes, _ = np.nonzero(lookup >= 0)
+        table = self.dimensions[dimension].take(lookup[lookup >= 0]).reset_index(drop=True)
+        table.insert(0, "month", pd.Categorical.from_codes(month_codes, categories=self.months))
+        return table
+
+
+def _pack_weekday_flags(df):
+    """Replace the seven Op_* flag columns of a tours frame by one uint8 WeekdayMask column."""
+    position = df.columns.get_loc(WEEKDAY_COLUMNS[0])
+    masks = pack_weekdays(df)
+    df = df.drop(columns=WEEKDAY_COLUMNS)
+    df.insert(position, WEEKDAY_MASK, masks)
+    return df
+
+
+def _build_dimension(frames, months):
+    """
+    Deduplicate a dimension across months and build its (month, id) -> row
+    lookup. Tour weekday flags are stored packed as a WeekdayMask.
+    """
+    combined, offsets = concat_months(
+        {m: frames[m].drop_duplicates("id") for m in months}, months
+    )
+    if set(WEEKDAY_COLUMNS) <= set(combined.columns):
+        combined = _pack_weekday_flags(combined)
+    attributes = [c for c in combined.columns if c != "month"]
+    row_of = combined.groupby(attributes, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    _, first = np.unique(row_of, return_index=True)
+    table = combined.iloc[first][attributes].reset_index(drop=True)
+
+    ids = combined["id"].to_numpy()
+    lookup = np.full((len(months), int(ids.max(initial=0)) + 1), -1, dtype=np.int32)
+    month_codes = combined["month"].cat.codes.to_numpy()
+    lookup[month_codes, ids] = row_of
+    return table, lookup
+
+
+def build_star_schema(months, facts, dimensions):
+    """
+    Build the star schema from `{dataset: {month: frame}}` mappings
+    (dicts or MonthStores) of fact datasets and of the tours/guides dimensions.
+    """
+    months = list(months)
+    tables, lookups = {}, {}
+    for dimension, frames in dimensions.items():
+        tables[dimension], lookups[dimension] = _build_dimension(frames, months)
+
+    star = StarSchema(months, {}, {}, tables, lookups)
+    for dataset, frames in facts.items():
+        combined, bounds = concat_months(frames, months)
+        month_codes = combined["month"].cat.codes.to_numpy()
+        for dimension, id_column in DIMENSION_IDS.items():
+            if dimension not in lookups or id_column not in combined.columns:
+                continue
+            lookup = lookups[dimension]
+            ids = combined[id_column].to_numpy().astype(np.int64)
+            known = (ids >= 0) & (ids < lookup.shape[1])
+            combined[DIMENSION_ROWS[dimension]] = np.where(
+                known, lookup[month_codes, np.clip(ids, 0, lookup.shape[1] - 1)], -1
+            ).astype(np.int32)
+        star.facts[dataset] = combined
+        star.offsets[dataset] = list(zip(bounds[:-1], bounds[1:]))
+    return star
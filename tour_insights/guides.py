@@ -0,0 +1,203 @@
+"""Per-guide metrics aggregated on integer GuideID codes."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.day_calendar import popcount
+from tour_insights.timeline import IntervalIndex, cell_day_keys, minutes_per_cell
+from tour_insights.topk import top_k_indices
+
+
+def day_numbers(dates) -> np.ndarray:
+    """Return dates as int64 day numbers (days since 1970-01-01)."""
+    return np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+def count_per_guide(guide_ids, minlength: int = 0) -> np.ndarray:
+    """Count rows per GuideID; position i of the result holds the count of guide i."""
+    guide_ids = np.asarray(guide_ids, dtype=np.int64)
+    return np.bincount(guide_ids[guide_ids >= 0], minlength=minlength)
+
+
+def values_per_guide(guide_ids, values, minlength: int = 0) -> np.ndarray:
+    """Scatter (GuideID, value) pairs, e.g. a grouped insight, into an array indexed by id."""
+    guide_ids = np.asarray(guide_ids, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    known = guide_ids >= 0
+    return np.bincount(guide_ids[known], weights=values[known], minlength=minlength).astype(np.int64)
+
+
+def guide_day_keys(guide_ids, dates) -> np.ndarray:
+    """Pack (GuideID, day) pairs into one int64 key: `GuideID << 32 | day`."""
+    return (np.asarray(guide_ids, dtype=np.int64) << 32) | day_numbers(dates)
+
+
+def guide_labels(guide_ids, names, groups=None) -> np.ndarray:
+    """
+    Display labels for guides: their name, followed by the id when several
+    guides share the same name (within the same `groups` value, e.g. month),
+    so they are never merged on a chart.
+    """
+    keys = pd.DataFrame({"name": pd.Series(names).astype(str).to_numpy()})
+    if groups is not None:
+        keys["group"] = np.asarray(groups)
+    shared = keys.duplicated(keep=False).to_numpy()
+    labels = keys["name"].to_numpy(dtype=object)
+    labels[shared] = [f"{name} ({guide_id})" for name, guide_id in zip(labels[shared], np.asarray(guide_ids)[shared])]
+    return labels
+
+
+def _guide_metric(guides_df, values):
+    """Return `(ids, labels, metric)` of the distinct guides of `guides_df`, 0 when absent from `values`."""
+    guides = guides_df.drop_duplicates("id")
+    ids = guides["id"].to_numpy().astype(np.int64)
+    values = np.asarray(values)
+    metric = np.zeros(len(ids), dtype=values.dtype if values.size else np.int64)
+    inside = (ids >= 0) & (ids < len(values))
+    metric[inside] = values[ids[inside]]
+    return ids, guide_labels(ids, guides["GuideName"]), metric
+
+
+def top_guides(guides_df, values, n: int = 10):
+    """Return the n guides with the highest positive metric, indexed by guide label."""
+    _, labels, metric = _guide_metric(guides_df, values)
+    top = top_k_indices(metric, n)
+    return pd.Series(metric[top], index=pd.Index(labels[top], name="GuideName"), name="count")
+
+
+def available_ranges(star, rows=None) -> IntervalIndex:
+    """
+    Index the parsed GuideAvailability ranges of the star's availability
+    facts by (month, GuideID, day). `rows` is an optional boolean mask of the
+    fact rows to keep.
+    """
+    avail = star.facts["availability"]
+    intervals = star.intervals("availability", "GuideAvailability")
+    owner = intervals.row_ids()
+    if rows is not None:
+        keep = np.asarray(rows, dtype=bool)[owner]
+        owner = owner[keep]
+        starts, ends = intervals.starts[keep], intervals.ends[keep]
+    else:
+        starts, ends = intervals.starts, intervals.ends
+
+    keys = cell_day_keys(
+        avail["month"].cat.codes.to_numpy()[owner],
+        avail["GuideID"].to_numpy()[owner],
+        day_numbers(avail["AvailabilityDate"].to_numpy()[owner]),
+        star.lookups["guides"].shape[1],
+    )
+    return IntervalIndex(keys, starts, ends)
+
+
+def booked_slots_frame(star, booking_stats, counts: bool = False):
+    """
+    The distinct booked (GuideID, day, TourID) slots of every month, read
+    from the BookingAggregates of each month, with the tour's TimeStart and
+    TimeEnd and, with `counts`, the Bookings of each slot. Slots of unknown
+    guides or tours are left out.
+    """
+    tours = star.dimensions["tours"]
+    n_ids = star.lookups["guides"].shape[1]
+    parts = []
+    for month in star.months:
+        guide_ids, days, tour_ids = booking_stats[month].booked_slots()
+        rows = star.rows("tours", month, tour_ids)
+        known = (rows >= 0) & (guide_ids >= 0) & (guide_ids < n_ids)
+        parts.append(
+            pd.DataFrame(
+                {
+                    "month": month,
+                    "GuideID": guide_ids[known],
+                    "BookingDate": days[known].astype("datetime64[D]").astype("datetime64[ns]"),
+                    "TourID": tour_ids[known],
+                    "TimeStart": tours["TimeStart"].to_numpy()[rows[known]],
+                    "TimeEnd": tours["TimeEnd"].to_numpy()[rows[known]],
+                }
+            )
+        )
+        if counts:
+            parts[-1]["Bookings"] = booking_stats[month].slot_counts[known]
+    slots = pd.concat(parts, ignore_index=True)
+    slots["month"] = pd.Categorical(slots["month"], categories=star.months)
+    return slots
+
+
+def booked_ranges(star, booking_stats) -> IntervalIndex:
+    """
+    Index the TimeStart-TimeEnd ranges of the distinct booked slots of each
+    month by (month, GuideID, day). Overlapping bookings of a guide are
+    merged, so no minute is counted twice.
+    """
+    slots = booked_slots_frame(star, booking_stats)
+    keys = cell_day_keys(
+        slots["month"].cat.codes.to_numpy(),
+        slots["GuideID"].to_numpy(),
+        day_numbers(slots["BookingDate"]),
+        star.lookups["guides"].shape[1],
+    )
+    return IntervalIndex(keys, slots["TimeStart"], slots["TimeEnd"])
+
+
+def minute_matrices(available, booked, n_months: int, n_ids: int):
+    """
+    Available minutes and booked minutes that fall inside availability, per
+    (month, GuideID), as two (n_months, n_ids) matrices.
+    """
+    covered = available.overlap(booked.keys, booked.starts, booked.ends)
+    return (
+        minutes_per_cell(available.keys, available.minutes(), n_months, n_ids),
+        minutes_per_cell(booked.keys, covered, n_months, n_ids),
+    )
+
+
+def _percent(part, whole):
+    """Rounded percentage, 0 where both are 0 (and inf where only `whole` is 0)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nan_to_num(np.round(part / whole * 100, 2), nan=0.0, posinf=np.inf)
+
+
+def guide_kpi_table(guides, calendar, minutes=None):
+    """
+    Per-(month, GuideID) guide KPIs for every guide of every month, read
+    from a GuideCalendar: DaysAvailable, DaysNotAvailable, DaysOccupied and
+    OccupancyPct, plus DaysBookedUnavailable and DaysAvailableIdle.
+
+    `guides` holds the guide rows of each month (`month`, `id`, `GuideName`),
+    as returned by StarSchema.monthly_dimension. `minutes` is an optional
+    pair of (n_months, n_ids) matrices of available and booked minutes, which
+    adds AvailableMinutes, BookedMinutes and MinuteOccupancyPct.
+    """
+    month_codes = guides["month"].cat.codes.to_numpy().astype(np.int64)
+    ids = guides["id"].to_numpy().astype(np.int64)
+
+    def pick(matrix):
+        inside = ids < matrix.shape[1]
+        values = np.zeros(len(ids), dtype=np.int64)
+        values[inside] = matrix[month_codes[inside], ids[inside]]
+        return values
+
+    def days(masks):
+        return pick(popcount(masks))
+
+    available_days = days(calendar.available)
+    occupied_days = days(calendar.booked)
+    table = pd.DataFrame(
+        {
+            "month": guides["month"].array,
+            "GuideID": ids,
+            "GuideName": guide_labels(ids, guides["GuideName"], groups=month_codes),
+            "DaysAvailable": available_days,
+            "DaysNotAvailable": days(calendar.not_available),
+            "DaysOccupied": occupied_days,
+            "OccupancyPct": _percent(occupied_days, available_days),
+            "DaysBookedUnavailable": days(calendar.booked_unavailable),
+            "DaysAvailableIdle": days(calendar.available_idle),
+        }
+    )
+    if minutes is not None:
+        available_minutes, booked_minutes = (pick(matrix) for matrix in minutes)
+        table["AvailableMinutes"] = available_minutes
+        table["BookedMinutes"] = booked_minutes
+        table["MinuteOccupancyPct"] = _percent(booked_minutes, available_minutes)
+    return table
@@ -0,0 +1,70 @@
+"""Declarative insight specs evaluated for all months in one grouped aggregation."""
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class InsightSpec:
+    """
+    One row-count insight, declared once instead of coded per month:
+
+    - dataset: fact table of the star schema, or "tours"/"guides" for the
+      dimension rows of each month
+    - keys: group keys besides `month`, columns of the table
+    - filter: function of the table returning a boolean row mask
+    """
+
+    dataset: str
+    keys: Tuple[str, ...]
+    filter: Optional[Callable] = None
+    name: str = "count"
+
+
+class InsightEngine:
+    """
+    Evaluate InsightSpecs against a StarSchema. Every spec is one filter and
+    one groupby over (month, *keys) on the month-partitioned table, so the
+    cost does not grow with one scan per month.
+    """
+
+    def __init__(self, star):
+        self.star = star
+        self._dimensions = {}
+
+    def table(self, dataset: str):
+        """Return the month-partitioned table of a fact dataset or dimension."""
+        if dataset in self.star.facts:
+            return self.star.facts[dataset]
+        if dataset not in self._dimensions:
+            self._dimensions[dataset] = self.star.monthly_dimension(dataset)
+        return self._dimensions[dataset]
+
+    def evaluate(self, spec: InsightSpec, months=None):
+        """
+        Return the rows per (month, *keys) as a long frame, sorted by month
+        and count descending. `months` restricts the evaluation to a subset
+        of the star's months.
+        """
+        table = self.table(spec.dataset)
+        mask = np.ones(len(table), dtype=bool)
+        if months is not None:
+            mask &= table["month"].isin(list(months)).to_numpy()
+        if spec.filter is not None:
+            mask &= np.asarray(spec.filter(table), dtype=bool)
+
+        work = table.loc[mask, ["month", *spec.keys]]
+        result = work.groupby(["month", *spec.keys], observed=True, sort=False).size().rename(spec.name)
+        result = result.reset_index().sort_values(["month", spec.name], ascending=[True, False], kind="stable")
+        return result.reset_index(drop=True)
+
+
+def by_month(result, months):
+    """Split a long insight frame into `{month: frame}`, with an empty frame for months without rows."""
+    codes = result["month"].astype(str).to_numpy()
+    return {
+        m: result[codes == m].drop(columns="month").reset_index(drop=True) for m in months
+    }
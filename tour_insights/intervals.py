@@ -0,0 +1,97 @@
+"""CSR storage of time-range columns such as GuideAvailability ("09:00-13:00/16:00-20:00")."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.schema import SchemaError
+
+# One HH:MM-HH:MM range; a value holds several ranges separated by "/"
+_RANGE = r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$"
+
+
+class Intervals:
+    """
+    Time ranges of many rows in CSR form: the ranges of row i are
+    `starts[offsets[i]:offsets[i + 1]]` to `ends[...]`, as uint16 minutes of
+    the day. Rows with a missing or empty value have no ranges.
+    """
+
+    def __init__(self, starts, ends, offsets):
+        self.starts = starts
+        self.ends = ends
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def counts(self) -> np.ndarray:
+        """Number of ranges of each row."""
+        return np.diff(self.offsets)
+
+    def row_ids(self) -> np.ndarray:
+        """Row of every range."""
+        return np.repeat(np.arange(len(self)), self.counts())
+
+    def minutes(self) -> np.ndarray:
+        """Total minutes covered by the ranges of each row."""
+        lengths = self.ends.astype(np.int64) - self.starts
+        return np.bincount(self.row_ids(), weights=lengths, minlength=len(self)).astype(np.int64)
+
+    def slice(self, start: int, stop: int):
+        """Rows start..stop-1 as a view, without copying the ranges."""
+        first, last = self.offsets[start], self.offsets[stop]
+        return Intervals(
+            self.starts[first:last], self.ends[first:last], self.offsets[start : stop + 1] - first
+        )
+
+    def take(self, rows):
+        """Rows in the given order, gathered without a Python loop per row."""
+        rows = np.asarray(rows, dtype=np.int64)
+        counts = self.counts()[rows]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        gather = np.repeat(self.offsets[rows] - offsets[:-1], counts) + np.arange(offsets[-1])
+        return Intervals(self.starts[gather], self.ends[gather], offsets)
+
+
+def _parse_labels(labels) -> Intervals:
+    """Parse distinct values into one Intervals row each, vectorized over the values."""
+    labels = pd.Series(labels, dtype=object).fillna("").astype(str).reset_index(drop=True)
+    pieces = labels.str.split("/").explode()
+    pieces = pieces[pieces.str.strip() != ""]
+
+    parts = pieces.str.extract(_RANGE).apply(pd.to_numeric).to_numpy(dtype=np.float64)
+    start_hours, start_minutes, end_hours, end_minutes = parts.T
+    starts = start_hours * 60 + start_minutes
+    ends = end_hours * 60 + end_minutes
+    invalid = (
+        np.isnan(parts).any(axis=1)
+        | (start_minutes > 59)
+        | (end_minutes > 59)
+        | (ends > 24 * 60)
+        | (ends < starts)
+    )
+    if invalid.any():
+        raise SchemaError(f"Invalid HH:MM-HH:MM time ranges {list(pieces[invalid][:5])}")
+
+    counts = np.bincount(pieces.index.to_numpy(dtype=np.int64), minlength=len(labels))
+    return Intervals(
+        starts.astype(np.uint16), ends.astype(np.uint16), np.concatenate([[0], np.cumsum(counts)])
+    )
+
+
+def parse_intervals(values) -> Intervals:
+    """
+    Parse a column of "HH:MM-HH:MM/HH:MM-HH:MM" values into CSR Intervals.
+    Each distinct value is parsed once and rows are expanded by their code,
+    so millions of rows cost a few array operations.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, labels = pd.factorize(values)
+
+    # Missing values (code -1) point at an extra row without ranges
+    dictionary = _parse_labels(labels)
+    dictionary.offsets = np.append(dictionary.offsets, dictionary.offsets[-1])
+    return dictionary.take(np.where(codes < 0, len(labels), codes))
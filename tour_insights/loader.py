@@ -0,0 +1,106 @@
+"""Loading of the monthly CSV datasets described in the README."""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from tour_insights.categories import SHARED_CATEGORIES
+from tour_insights.schema import DATASETS, read_with_schema
+
+# Year used by default when building monthly file names
+DEFAULT_YEAR = 2025
+
+
+def dataset_path(dataset: str, month: str, year: int = DEFAULT_YEAR, data_dir: str = ".") -> str:
+    """Return the CSV path of a dataset for a given month (format '03', '04', etc.)."""
+    return os.path.join(data_dir, f"{DATASETS[dataset]['prefix']}_{month}-{year}.csv")
+
+
+def read_dataset(dataset: str, month: str, year: int = DEFAULT_YEAR, data_dir: str = "."):
+    """Parse one dataset straight from its CSV using its typed schema."""
+    return read_with_schema(dataset_path(dataset, month, year, data_dir), dataset)
+
+
+def _load_local(dataset, month, year, data_dir, cache):
+    """Load one dataset with month-local categories, going through `cache` when given."""
+    if cache is None:
+        return read_dataset(dataset, month, year, data_dir)
+    return cache.load(
+        dataset_path(dataset, month, year, data_dir),
+        lambda: read_dataset(dataset, month, year, data_dir),
+    )
+
+
+def load_dataset(dataset: str, month: str, year: int = DEFAULT_YEAR, data_dir: str = ".", cache=None):
+    """
+    Load one dataset, going through `cache` (a DatasetCache) when given.
+    Text columns are encoded on the category dictionaries shared by all months.
+    """
+    return SHARED_CATEGORIES.conform(_load_local(dataset, month, year, data_dir, cache))
+
+
+def _timed_load(dataset, month, year, data_dir, cache):
+    """Load one dataset and return it with the elapsed wall time in seconds."""
+    start = time.perf_counter()
+    df = _load_local(dataset, month, year, data_dir, cache)
+    return df, time.perf_counter() - start
+
+
+def load_all_months(
+    months, year: int = DEFAULT_YEAR, data_dir: str = ".", cache=None, workers=None, datasets=None
+):
+    """
+    Load every dataset (or only `datasets`) of every month, scheduling each
+    (month, dataset) pair as its own task on a process pool.
+
+    Results are streamed back into an `all_data[month][dataset]` dictionary
+    whose order always follows `months` and `datasets`, whatever order the tasks
+    finish in. `workers=None` uses one worker per CPU and `workers=1` loads
+    serially in the current process.
+
+    Returns `(all_data, load_times)`, where `load_times` holds the row count and
+    load time of every file.
+    """
+    datasets = list(DATASETS) if datasets is None else list(datasets)
+    tasks = [(month, dataset) for month in months for dataset in datasets]
+    all_data = {month: dict.fromkeys(datasets) for month in months}
+    seconds = {}
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    if workers == 1:
+        for month, dataset in tasks:
+            all_data[month][dataset], seconds[month, dataset] = _timed_load(
+                dataset, month, year, data_dir, cache
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_timed_load, dataset, month, year, data_dir, cache): (month, dataset)
+                for month, dataset in tasks
+            }
+            for future in as_completed(futures):
+                month, dataset = futures[future]
+                all_data[month][dataset], seconds[month, dataset] = future.result()
+
+    # Worker processes have their own dictionaries, so shared codes are assigned
+    # here, in task order, to keep them deterministic
+    for month, dataset in tasks:
+        SHARED_CATEGORIES.conform(all_data[month][dataset])
+
+    load_times = pd.DataFrame(
+        [
+            {
+                "month": month,
+                "dataset": dataset,
+                "rows": len(all_data[month][dataset]),
+                "seconds": round(seconds[month, dataset], 4),
+            }
+            for month, dataset in tasks
+        ]
+    )
+    return all_data, load_times
@@ -0,0 +1,175 @@
+"""Tour operating calendars: weekday flags expanded into concrete operating dates."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.weekdays import WEEKDAY_MASK, weekday_numbers
+
+
+def date_dimension(months, year: int) -> pd.DataFrame:
+    """One row per date of the given months, in chronological order, with its month and weekday (0 = Monday)."""
+    starts = np.array([f"{year}-{m}" for m in months], dtype="datetime64[M]")
+    order = np.argsort(starts, kind="stable")
+    dates = [np.arange(starts[i], starts[i] + 1, dtype="datetime64[D]") for i in order]
+    days = np.concatenate(dates)
+    return pd.DataFrame(
+        {
+            "Date": days.astype("datetime64[ns]"),
+            "month": pd.Categorical.from_codes(
+                np.repeat(order, [len(d) for d in dates]), categories=list(months)
+            ),
+            "Weekday": weekday_numbers(days.astype(np.int64)),
+        }
+    )
+
+
+class OperatingCalendar:
+    """
+    The dates each tour operates, built once by testing the bit of every
+    date's weekday in the tours' WeekdayMask.
+
+    Rows are the tours of every month in (month, id) order, as returned by
+    `StarSchema.monthly_dimension("tours")`. A tour operates only in its own
+    month, so each row holds that month's days only: `matrix[row, offset]`
+    is the day `offset` of the row's month (False past the month's end),
+    and memory grows with tours × 31 rather than tours × all dates. Columns
+    passed in and out are positions in the date dimension. A cumulative
+    count per row makes operating days over any date range two lookups.
+    """
+
+    def __init__(self, tours, months, year: int):
+        self.months = list(months)
+        self.tours = tours.reset_index(drop=True)
+        self.dates = date_dimension(self.months, year)
+
+        # First date column and number of days of each month
+        date_months = self.dates["month"].cat.codes.to_numpy()
+        self._month_lengths = np.bincount(date_months, minlength=len(self.months))
+        self._month_starts = np.zeros(len(self.months), dtype=np.int64)
+        self._month_starts[date_months[::-1]] = np.arange(len(date_months))[::-1]
+
+        tour_months = self.tours["month"].cat.codes.to_numpy().astype(np.int64)
+        self._row_starts = self._month_starts[tour_months]
+        self._row_lengths = self._month_lengths[tour_months]
+        width = int(self._month_lengths.max(initial=0))
+        offsets = np.arange(width)
+        # Offsets past a month's end are clamped to the last date and masked below
+        columns = np.minimum(self._row_starts[:, None] + offsets[None, :], len(self.dates) - 1)
+        weekdays = self.dates["Weekday"].to_numpy()[columns]
+        masks = self.tours[WEEKDAY_MASK].to_numpy().astype(np.int64)
+        self.matrix = ((masks[:, None] >> weekdays) & 1).astype(bool) & (offsets[None, :] < self._row_lengths[:, None])
+        self._cumulative = np.zeros((len(self.tours), width + 1), dtype=np.uint8)
+        np.cumsum(self.matrix, axis=1, out=self._cumulative[:, 1:])
+
+        ids = self.tours["id"].to_numpy().astype(np.int64)
+        self._lookup = np.full((len(self.months), int(ids.max(initial=0)) + 1), -1, dtype=np.int64)
+        self._lookup[tour_months, ids] = np.arange(len(self.tours))
+        self._days = self.dates["Date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+
+    def rows(self, month_codes, tour_ids) -> np.ndarray:
+        """Matrix rows of (month, TourID) pairs (-1 when unknown)."""
+        month_codes = np.asarray(month_codes, dtype=np.int64)
+        tour_ids = np.asarray(tour_ids, dtype=np.int64)
+        known = (tour_ids >= 0) & (tour_ids < self._lookup.shape[1])
+        return np.where(known, self._lookup[month_codes, np.clip(tour_ids, 0, self._lookup.shape[1] - 1)], -1)
+
+    def columns(self, days) -> np.ndarray:
+        """Matrix columns of day numbers (-1 for dates outside the months)."""
+        days = np.asarray(days, dtype=np.int64)
+        positions = np.clip(np.searchsorted(self._days, days), 0, len(self._days) - 1)
+        return np.where(self._days[positions] == days, positions, -1)
+
+    def _bounds(self, start=None, end=None):
+        """Column range [low, high) of the dates between `start` and `end`, inclusive."""
+        low = 0 if start is None else np.searchsorted(self._days, np.datetime64(start, "D").astype(np.int64))
+        high = len(self._days) if end is None else np.searchsorted(
+            self._days, np.datetime64(end, "D").astype(np.int64), side="right"
+        )
+        return low, max(low, high)
+
+    def in_range(self, columns, start=None, end=None) -> np.ndarray:
+        """Whether matrix columns fall between `start` and `end`, inclusive."""
+        low, high = self._bounds(start, end)
+        columns = np.asarray(columns)
+        return (columns >= low) & (columns < high)
+
+    def _offsets(self, bound) -> np.ndarray:
+        """A date column bound as a day offset within every row's month, clipped to the month."""
+        return np.clip(bound - self._row_starts, 0, self._row_lengths)
+
+    def operating_days(self, start=None, end=None) -> np.ndarray:
+        """Operating dates of every tour row between `start` and `end`, inclusive."""
+        low, high = self._bounds(start, end)
+        rows = np.arange(len(self.tours))
+        return (
+            self._cumulative[rows, self._offsets(high)].astype(np.int64)
+            - self._cumulative[rows, self._offsets(low)]
+        )
+
+    def is_operating(self, rows, columns) -> np.ndarray:
+        """Whether each (row, column) pair is an operating date; unknown rows or dates are not."""
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        known = (rows >= 0) & (columns >= 0)
+        offsets = columns[known] - self._row_starts[rows[known]]
+        inside = (offsets >= 0) & (offsets < self._row_lengths[rows[known]])
+        operating = np.zeros(len(rows), dtype=bool)
+        operating[np.flatnonzero(known)[inside]] = self.matrix[rows[known][inside], offsets[inside]]
+        return operating
+
+
+def _tour_day_bookings(calendar, booking_stats):
+    """Return `(rows, days, counts)` of the booked (tour, date) pairs of every month."""
+    rows, days, counts = [], [], []
+    for code, month in enumerate(calendar.months):
+        tour_ids, month_days, month_counts = booking_stats[month].tour_day_bookings()
+        rows.append(calendar.rows(np.full(len(tour_ids), code), tour_ids))
+        days.append(month_days)
+        counts.append(month_counts)
+    return np.concatenate(rows), np.concatenate(days), np.concatenate(counts)
+
+
+def tour_utilization(calendar, booking_stats, start=None, end=None) -> pd.DataFrame:
+    """
+    Bookings per operating date of every tour between `start` and `end`
+    (inclusive, default: all months). Bookings of unknown tours are left out;
+    BookingsPerDate is NaN for a tour without operating dates.
+    """
+    rows, days, counts = _tour_day_bookings(calendar, booking_stats)
+    keep = (rows >= 0) & calendar.in_range(calendar.columns(days), start, end)
+    bookings = np.bincount(rows[keep], weights=counts[keep], minlength=len(calendar.tours)).astype(np.int64)
+
+    table = calendar.tours[["month", "id", "TourName", "TourLocation"]].copy()
+    table["Bookings"] = bookings
+    table["OperatingDates"] = calendar.operating_days(start, end)
+    table["BookingsPerDate"] = table["Bookings"] / table["OperatingDates"].where(table["OperatingDates"] > 0)
+    return table
+
+
+def location_utilization(utilization) -> pd.DataFrame:
+    """Roll tour utilization up to bookings per operating date of each (month, TourLocation)."""
+    table = (
+        utilization.groupby(["month", "TourLocation"], observed=True)[["Bookings", "OperatingDates"]]
+        .sum()
+        .reset_index()
+    )
+    table["BookingsPerDate"] = table["Bookings"] / table["OperatingDates"].where(table["OperatingDates"] > 0)
+    return table
+
+
+def off_day_bookings(calendar, booking_stats) -> pd.DataFrame:
+    """Bookings of known tours on a date the tour does not operate, per (month, TourID, BookingDate)."""
+    rows, days, counts = _tour_day_bookings(calendar, booking_stats)
+    flagged = (rows >= 0) & ~calendar.is_operating(rows, calendar.columns(days))
+
+    tours = calendar.tours.iloc[rows[flagged]].reset_index(drop=True)
+    return pd.DataFrame(
+        {
+            "month": tours["month"],
+            "TourID": tours["id"],
+            "TourName": tours["TourName"],
+            "TourLocation": tours["TourLocation"],
+            "BookingDate": days[flagged].astype("datetime64[D]").astype("datetime64[ns]"),
+            "Bookings": counts[flagged],
+        }
+    )
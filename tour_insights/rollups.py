@@ -0,0 +1,177 @@
+"""Mergeable per-month rollups, combined across any set of months by key."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.comparison import MonthComparison
+from tour_insights.day_calendar import popcount
+from tour_insights.guides import guide_labels
+from tour_insights.hll import DEFAULT_ERROR, DistinctCounter
+from tour_insights.weekdays import WEEKDAY_MASK, operating_weekdays
+
+# HyperLogLog counters of a rollup and what each counts. Distinct days per guide need
+# none: days never repeat across months, so summing the popcounts of the day masks is exact
+DISTINCT_COUNTERS = {
+    "location_guides": "distinct GuideIDs booked on the tours of each TourLocation",
+}
+
+# Key columns of each rollup table
+ROLLUP_KEYS = {"guides": ["GuideID"], "tours": ["TourID"], "locations": ["TourLocation"]}
+
+
+def _or_masks(masks):
+    """Bitwise OR of a group of day or weekday masks."""
+    return np.bitwise_or.reduce(masks.to_numpy())
+
+
+class MonthlyRollup:
+    """
+    Summary of one month, small enough to keep for every month:
+
+    - guides: Bookings per GuideID (with its GuideName as in the guides file)
+      and the AvailableDays and BookedDays of the month as 31-bit day masks
+    - tours: Bookings and the WeekdayMask of every TourID
+    - distinct: HyperLogLog counters of the few low-cardinality keys, such as
+      locations (see DISTINCT_COUNTERS)
+
+    Sums add, masks are OR-ed and counter registers take the maximum, so
+    rollups of separate files or chunks of the same month merge without the
+    rows that produced them. Day counts and the location rollup are derived
+    on demand.
+    """
+
+    def __init__(self, month: str, guides, tours, distinct=None):
+        self.month = month
+        self.guides = guides.reset_index(drop=True)
+        self.tours = tours.reset_index(drop=True)
+        self.distinct = distinct or {}
+
+    def merge(self, other):
+        """Fold the rollup of another file or chunk of the same month into this one."""
+        if other.month != self.month:
+            raise ValueError(f"Cannot merge the rollup of month {other.month} into month {self.month}")
+        self.guides = self._reduce(
+            self.guides, other.guides, ROLLUP_KEYS["guides"], ["AvailableDays", "BookedDays"]
+        )
+        self.tours = self._reduce(self.tours, other.tours, ROLLUP_KEYS["tours"], [WEEKDAY_MASK])
+        for name, counter in other.distinct.items():
+            if name in self.distinct:
+                self.distinct[name].merge(counter)
+            else:
+                self.distinct[name] = counter
+        return self
+
+    @staticmethod
+    def _reduce(table, other, keys, masks):
+        """Sum the counts and OR the masks of rows sharing a key."""
+        combined = pd.concat([table, other], ignore_index=True)
+        attributes = [c for c in combined.columns if c not in keys and c not in masks and c != "Bookings"]
+        aggregations = {"Bookings": "sum", **{c: _or_masks for c in masks}, **{c: "first" for c in attributes}}
+        reduced = combined.groupby(keys, observed=True, sort=False).agg(aggregations).reset_index()
+        numeric = {c: t for c, t in table.dtypes.items() if not isinstance(t, pd.CategoricalDtype)}
+        return reduced[table.columns].astype(numeric)
+
+    def table(self, name: str) -> pd.DataFrame:
+        """Return the guides, tours or locations rollup with its derived counts."""
+        if name == "guides":
+            return self.guides.assign(
+                DaysAvailable=popcount(self.guides["AvailableDays"].to_numpy()),
+                DaysBooked=popcount(self.guides["BookedDays"].to_numpy()),
+            )
+        if name == "tours":
+            return self.tours.assign(OperatingDays=operating_weekdays(self.tours[WEEKDAY_MASK].to_numpy()))
+        if name == "locations":
+            return (
+                self.table("tours")
+                .groupby("TourLocation", observed=True)
+                .agg(Tours=("TourID", "size"), OperatingDays=("OperatingDays", "sum"), Bookings=("Bookings", "sum"))
+                .reset_index()
+            )
+        raise KeyError(f"Unknown rollup table {name!r}")
+
+
+def build_rollups(star, guide_calendar, booking_stats, months=None, distinct_error=DEFAULT_ERROR):
+    """
+    Build the rollups of `months` (default: every month of the star) from
+    the guide calendar masks and the booking aggregates, with HyperLogLog
+    counters sized for `distinct_error`.
+    """
+    guide_rows = star.monthly_dimension("guides")[["month", "id", "GuideName"]].rename(columns={"id": "GuideID"})
+    guide_codes = guide_rows["month"].cat.codes.to_numpy()
+    guide_ids = guide_rows["GuideID"].to_numpy()
+    guides = guide_rows.assign(
+        AvailableDays=guide_calendar.available[guide_codes, guide_ids],
+        BookedDays=guide_calendar.booked[guide_codes, guide_ids],
+    )
+    tours = star.monthly_dimension("tours")
+    tours = tours[["month", "id", "TourName", "TourLocation", WEEKDAY_MASK]].rename(columns={"id": "TourID"})
+
+    rollups = {}
+    for month in star.months if months is None else months:
+        stats = booking_stats[month]
+        month_guides = guides[guides["month"] == month].drop(columns="month")
+        month_tours = tours[tours["month"] == month].drop(columns="month")
+        month_guides.insert(2, "Bookings", _counts_of(stats.guide_counts, month_guides["GuideID"]))
+        month_tours.insert(3, "Bookings", _counts_of(stats.tour_counts, month_tours["TourID"]))
+        distinct = _distinct_counters(star, month, stats, distinct_error)
+        rollups[month] = MonthlyRollup(month, month_guides, month_tours, distinct)
+    return rollups
+
+
+def _distinct_counters(star, month, stats, error):
+    """HyperLogLog counters of one month, from its booked slots."""
+    counters = {name: DistinctCounter.for_error(error) for name in DISTINCT_COUNTERS}
+
+    guide_ids, _, tour_ids = stats.booked_slots()
+    rows = star.rows("tours", month, tour_ids)
+    locations = star.dimensions["tours"]["TourLocation"].reindex(rows).to_numpy()
+    located = pd.notna(locations)
+    counters["location_guides"].add(locations[located], guide_ids[located])
+    return counters
+
+
+def combine_distinct(rollups, name: str) -> pd.Series:
+    """
+    Estimated distinct values per key of a counter over all `rollups`
+    ({month: MonthlyRollup}). Every rollup must carry the counter.
+    """
+    missing = [month for month, rollup in rollups.items() if name not in rollup.distinct]
+    if missing:
+        raise ValueError(f"Rollups of months {missing} have no {name!r} counter")
+    combined = None
+    for rollup in rollups.values():
+        counter = rollup.distinct[name]
+        if combined is None:
+            combined = DistinctCounter(counter.precision)
+        combined.merge(counter)
+    return combined.estimate()
+
+
+def _counts_of(counts, ids):
+    """Look up an id-indexed count array, 0 for ids past its end."""
+    ids = np.asarray(ids, dtype=np.int64)
+    inside = ids < len(counts)
+    return np.where(inside, counts[np.where(inside, ids, 0)], 0).astype(np.int64)
+
+
+def combine_rollups(rollups, name: str, value: str) -> MonthComparison:
+    """
+    Compare `value` of a rollup table across the months of `rollups`
+    ({month: MonthlyRollup}, in order), one entity per key. Guides get one
+    GuideName each: their latest name, with the id added when guides share it.
+    """
+    comparison = MonthComparison.from_frames(
+        {month: rollup.table(name) for month, rollup in rollups.items()}, ROLLUP_KEYS[name], value
+    )
+    if name == "guides":
+        names = (
+            pd.concat(
+                [rollup.guides[["GuideID", "GuideName"]].astype({"GuideName": str}) for rollup in rollups.values()]
+            )
+            .drop_duplicates("GuideID", keep="last")
+            .set_index("GuideID")["GuideName"]
+        )
+        ids = comparison.keys["GuideID"].to_numpy()
+        comparison.keys["GuideName"] = guide_labels(ids, names.reindex(ids).to_numpy())
+    return comparison
+
@@ -0,0 +1,159 @@
+"""Typed schema registry for the monthly datasets documented in the README."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.categories import to_normalized_categorical
+
+# Column kinds that need more than a plain read_csv dtype
+DATE = "date"  # YYYY-MM-DD, parsed once per distinct value into datetime64
+TIME = "time"  # HH:MM, parsed once per distinct value into a uint16 minute of day
+FLAG = "flag"  # 0/1 weekday flag, stored as bool
+TEXT = "text"  # free text, normalized into a Categorical
+
+# Weekday operating flags of the tours dataset, Monday first
+WEEKDAY_COLUMNS = [
+    "Op_Monday",
+    "Op_Tuesday",
+    "Op_Wednesday",
+    "Op_Thursday",
+    "Op_Friday",
+    "Op_Saturday",
+    "Op_Sunday",
+]
+
+# File prefix and typed columns of each monthly dataset
+DATASETS = {
+    "bookings": {
+        "prefix": "bookings",
+        "columns": {"id": "int32", "TourID": "int32", "BookingDate": DATE, "GuideID": "int32"},
+    },
+    "tours": {
+        "prefix": "tours",
+        "columns": {
+            "id": "int32",
+            "TourName": TEXT,
+            "TourLocation": TEXT,
+            "TimeStart": TIME,
+            "TimeEnd": TIME,
+            **{column: FLAG for column in WEEKDAY_COLUMNS},
+        },
+    },
+    "guides": {
+        "prefix": "guides",
+        "columns": {"id": "int32", "GuideName": TEXT, "GuideLocation": TEXT},
+    },
+    "availability": {
+        "prefix": "guide_avail",
+        "columns": {"GuideID": "int32", "AvailabilityDate": DATE, "GuideAvailability": "category"},
+    },
+    "skills": {
+        "prefix": "guide_skills",
+        "columns": {"GuideID": "int32", "TourID": "int32"},
+    },
+}
+
+# dtype handed to read_csv for each special column kind
+_CSV_DTYPES = {DATE: "category", TIME: "category", FLAG: "int8", TEXT: "category"}
+
+
+class SchemaError(ValueError):
+    """Raised when a CSV file does not match its documented schema."""
+
+
+def _codes(series, path, column):
+    """Return the category codes of a column, rejecting missing values."""
+    codes = series.cat.codes.to_numpy()
+    if (codes < 0).any():
+        raise SchemaError(f"{path}: column {column} has missing values")
+    return codes
+
+
+def _parse_dates(series, path, column):
+    try:
+        dates = pd.to_datetime(series.cat.categories, format="%Y-%m-%d")
+    except (ValueError, TypeError):
+        raise SchemaError(f"{path}: column {column} has values that are not YYYY-MM-DD dates") from None
+    return pd.Series(dates.to_numpy()[_codes(series, path, column)], index=series.index, name=column)
+
+
+def _parse_times(series, path, column):
+    labels = pd.Index(series.cat.categories, dtype=object).astype(str).str.strip("'\" ")
+    parts = labels.str.extract(r"^(\d{1,2}):(\d{2})$")
+    hours = pd.to_numeric(parts[0]).to_numpy()
+    minutes = pd.to_numeric(parts[1]).to_numpy()
+    invalid = np.isnan(hours) | np.isnan(minutes) | (minutes > 59) | (hours * 60 + minutes > 24 * 60)
+    if invalid.any():
+        raise SchemaError(f"{path}: column {column} has invalid HH:MM values {list(labels[invalid][:5])}")
+    minute_of_day = (hours * 60 + minutes).astype(np.uint16)
+    return pd.Series(minute_of_day[_codes(series, path, column)], index=series.index, name=column)
+
+
+def _parse_flags(series, path, column):
+    if not series.isin([0, 1]).all():
+        raise SchemaError(f"{path}: column {column} must only contain 0/1 flags")
+    return series.astype(bool)
+
+
+def _check_header(path, columns):
+    """Reject a file whose header lacks documented columns, before parsing its body."""
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise SchemaError(f"{path}: missing columns {missing}")
+
+
+def _convert(df, path, columns):
+    """Convert the special column kinds of a freshly read frame or chunk."""
+    for column, kind in columns.items():
+        if kind == DATE:
+            df[column] = _parse_dates(df[column], path, column)
+        elif kind == TIME:
+            df[column] = _parse_times(df[column], path, column)
+        elif kind == FLAG:
+            df[column] = _parse_flags(df[column], path, column)
+        elif kind == TEXT:
+            df[column] = to_normalized_categorical(df[column])
+    return df[list(columns)]
+
+
+def iter_with_schema(path: str, dataset: str, chunksize=None):
+    """
+    Yield a dataset CSV as typed frames of at most `chunksize` rows
+    (a single frame when `chunksize` is None). See read_with_schema.
+    """
+    columns = DATASETS[dataset]["columns"]
+    _check_header(path, columns)
+
+    try:
+        reader = pd.read_csv(
+            path,
+            usecols=list(columns),
+            dtype={column: _CSV_DTYPES.get(kind, kind) for column, kind in columns.items()},
+            chunksize=chunksize,
+        )
+        for chunk in [reader] if chunksize is None else reader:
+            yield _convert(chunk, path, columns)
+    except SchemaError:
+        raise
+    except (ValueError, TypeError) as error:
+        raise SchemaError(f"{path}: {error}") from None
+
+
+def read_with_schema(path: str, dataset: str):
+    """
+    Read a dataset CSV in one pass with compact, explicit dtypes.
+
+    Ids are int32, weekday flags bool, text columns normalized Categoricals,
+    dates datetime64 and times uint16 minutes of the day. Dates and times are
+    parsed once per distinct value. Missing columns, non-integer ids and
+    malformed dates, times or flags raise SchemaError.
+    """
+    return next(iter_with_schema(path, dataset))
+
+
+def minutes_to_hhmm(minutes) -> pd.Series:
+    """Format minute-of-day values back into HH:MM strings for display."""
+    minutes = pd.Series(minutes)
+    hours = (minutes // 60).astype(int).astype(str).str.zfill(2)
+    return hours + ":" + (minutes % 60).astype(int).astype(str).str.zfill(2)
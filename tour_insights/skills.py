@@ -0,0 +1,148 @@
+"""Sparse guide × tour skill matrices and coverage queries over them."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.guides import booked_slots_frame
+
+# Low 32 bits of a packed (GuideID << 32) | TourID skill key
+_TOUR_MASK = 0xFFFFFFFF
+
+
+def skill_keys(guide_ids, tour_ids) -> np.ndarray:
+    """Pack (GuideID, TourID) pairs into int64 `(GuideID << 32) | TourID` keys."""
+    return (np.asarray(guide_ids, dtype=np.int64) << 32) | np.asarray(tour_ids, dtype=np.int64)
+
+
+class SkillMatrix:
+    """
+    Boolean GuideID × TourID matrix in CSR form: the tours guide g is skilled
+    for are `tour_ids[offsets[g]:offsets[g + 1]]`, in TourID order. The same
+    entries are kept as sorted packed keys, so checking any number of
+    (guide, tour) pairs is one binary search, and memory grows with the
+    number of skills rather than guides × tours.
+    """
+
+    def __init__(self, keys, n_guides: int, n_tours: int):
+        self.keys = keys
+        self.n_tours = n_tours
+        self.tour_ids = (keys & _TOUR_MASK).astype(np.int32)
+        per_guide = np.bincount(keys >> 32, minlength=n_guides)
+        self.offsets = np.concatenate([[0], np.cumsum(per_guide)])
+
+    @classmethod
+    def from_pairs(cls, guide_ids, tour_ids, n_guides: int, n_tours: int):
+        """Build from (GuideID, TourID) pairs; duplicates and ids outside the shape are dropped."""
+        guide_ids = np.asarray(guide_ids, dtype=np.int64)
+        tour_ids = np.asarray(tour_ids, dtype=np.int64)
+        inside = (guide_ids >= 0) & (guide_ids < n_guides) & (tour_ids >= 0) & (tour_ids < n_tours)
+        return cls(np.unique(skill_keys(guide_ids[inside], tour_ids[inside])), n_guides, n_tours)
+
+    @property
+    def n_guides(self) -> int:
+        return len(self.offsets) - 1
+
+    def __len__(self):
+        return len(self.keys)
+
+    def guide_ids(self) -> np.ndarray:
+        """GuideID of every entry."""
+        return np.repeat(np.arange(self.n_guides), np.diff(self.offsets))
+
+    def guides_per_tour(self) -> np.ndarray:
+        """Number of guides qualified for each TourID."""
+        return np.bincount(self.tour_ids, minlength=self.n_tours)
+
+    def tours_below(self, min_guides: int, tour_ids) -> np.ndarray:
+        """The `tour_ids` with fewer than `min_guides` qualified guides."""
+        tour_ids = np.asarray(tour_ids, dtype=np.int64)
+        return tour_ids[self.guides_per_tour()[tour_ids] < min_guides]
+
+    def contains(self, guide_ids, tour_ids) -> np.ndarray:
+        """Whether each guide is skilled for the tour at the same position."""
+        keys = skill_keys(guide_ids, tour_ids)
+        if len(self.keys) == 0:
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return self.keys[positions] == keys
+
+
+def build_skill_matrices(star):
+    """The skill matrix of every month, from the skills facts of known guides and tours."""
+    skills = star.facts["skills"]
+    known = (skills["GuideRow"] >= 0).to_numpy() & (skills["TourRow"] >= 0).to_numpy()
+    month_codes = skills["month"].cat.codes.to_numpy()
+    n_guides = star.lookups["guides"].shape[1]
+    n_tours = star.lookups["tours"].shape[1]
+    return {
+        month: SkillMatrix.from_pairs(
+            skills["GuideID"].to_numpy()[known & (month_codes == code)],
+            skills["TourID"].to_numpy()[known & (month_codes == code)],
+            n_guides,
+            n_tours,
+        )
+        for code, month in enumerate(star.months)
+    }
+
+
+def tour_skill_coverage(star, matrices) -> pd.DataFrame:
+    """Qualified guides of every tour of every month."""
+    table = star.monthly_dimension("tours")[["month", "id", "TourName", "TourLocation"]]
+    month_codes = table["month"].cat.codes.to_numpy()
+    tour_ids = table["id"].to_numpy()
+    qualified = np.zeros(len(table), dtype=np.int64)
+    for code, month in enumerate(star.months):
+        rows = month_codes == code
+        qualified[rows] = matrices[month].guides_per_tour()[tour_ids[rows]]
+    return table.assign(QualifiedGuides=qualified)
+
+
+def location_skill_coverage(star, matrices, coverage, min_guides: int = 1) -> pd.DataFrame:
+    """
+    Roll tour coverage up to each (month, TourLocation): Tours, CoveredTours
+    (tours with at least `min_guides` qualified guides), CoveragePct and
+    QualifiedGuides, the distinct guides qualified for any tour there.
+    """
+    locations = coverage["TourLocation"].cat.codes.to_numpy().astype(np.int64)
+    n_locations = len(coverage["TourLocation"].cat.categories)
+    month_codes = coverage["month"].cat.codes.to_numpy()
+    tour_ids = coverage["id"].to_numpy()
+
+    # Distinct (guide, location) pairs of each month, counted per location
+    qualified = np.zeros((len(star.months), n_locations), dtype=np.int64)
+    for code, month in enumerate(star.months):
+        matrix = matrices[month]
+        rows = month_codes == code
+        location_of = np.full(matrix.n_tours, -1, dtype=np.int64)
+        location_of[tour_ids[rows]] = locations[rows]
+        entries = location_of[matrix.tour_ids]
+        located = entries >= 0
+        pairs = np.unique(matrix.guide_ids()[located] * n_locations + entries[located])
+        qualified[code] = np.bincount(pairs % n_locations, minlength=n_locations)
+
+    table = (
+        coverage.assign(Covered=coverage["QualifiedGuides"] >= min_guides)
+        .groupby(["month", "TourLocation"], observed=True)
+        .agg(Tours=("id", "size"), CoveredTours=("Covered", "sum"))
+        .reset_index()
+    )
+    table["CoveragePct"] = (100 * table["CoveredTours"] / table["Tours"]).round(1)
+    table["QualifiedGuides"] = qualified[
+        table["month"].cat.codes.to_numpy(), table["TourLocation"].cat.codes.to_numpy()
+    ]
+    return table
+
+
+def unskilled_bookings(star, booking_stats, matrices) -> pd.DataFrame:
+    """
+    Bookings whose guide is not skilled for the tour, one row per booked
+    (GuideID, day, TourID) slot with its number of Bookings. Read from the
+    BookingAggregates, so streamed months are covered too.
+    """
+    slots = booked_slots_frame(star, booking_stats, counts=True)
+    month_codes = slots["month"].cat.codes.to_numpy()
+    skilled = np.zeros(len(slots), dtype=bool)
+    for code, month in enumerate(star.months):
+        rows = month_codes == code
+        skilled[rows] = matrices[month].contains(slots["GuideID"].to_numpy()[rows], slots["TourID"].to_numpy()[rows])
+    return slots[~skilled].reset_index(drop=True)
@@ -0,0 +1,118 @@
+"""Lazy, memory-capped access to the monthly datasets."""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from tour_insights.loader import DEFAULT_YEAR, load_all_months, load_dataset
+from tour_insights.schema import DATASETS
+
+
+def frame_nbytes(df) -> int:
+    """Return the in-memory size of a DataFrame in bytes, including string contents."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+class FrameCache:
+    """
+    In-memory LRU cache of loaded (month, dataset) frames.
+
+    Frames are read (through the on-disk DatasetCache when given) the first time
+    they are requested. Once the total size goes over `max_bytes`, the least
+    recently used frames are dropped and will be read again on next access.
+    `max_bytes=None` keeps everything.
+    """
+
+    def __init__(self, year: int = DEFAULT_YEAR, data_dir: str = ".", cache=None, max_bytes=None):
+        self.year = year
+        self.data_dir = data_dir
+        self.cache = cache
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._frames = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    def loaded(self):
+        """Return the (month, dataset) pairs currently held in memory, coldest first."""
+        return list(self._frames)
+
+    def get(self, month: str, dataset: str):
+        """Return the frame of `dataset` for `month`, reading it on first access."""
+        key = (month, dataset)
+        if key in self._frames:
+            self._frames.move_to_end(key)
+            return self._frames[key][0]
+        df = load_dataset(dataset, month, self.year, self.data_dir, self.cache)
+        self.put(month, dataset, df)
+        return df
+
+    def put(self, month: str, dataset: str, df):
+        """Store an already loaded frame, evicting cold frames if over the memory cap."""
+        key = (month, dataset)
+        if key in self._frames:
+            self.nbytes -= self._frames.pop(key)[1]
+        size = frame_nbytes(df)
+        self._frames[key] = (df, size)
+        self.nbytes += size
+
+        # Never evict the frame that was just stored, even if it alone exceeds the cap
+        while self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._frames) > 1:
+            _, (_, evicted_size) = self._frames.popitem(last=False)
+            self.nbytes -= evicted_size
+
+    def prefetch(self, months, datasets=None, workers=None):
+        """
+        Read the given months (all datasets by default) in parallel and keep them
+        in memory. Returns the per-file load-time table of `load_all_months`.
+        """
+        all_data, load_times = load_all_months(
+            months,
+            year=self.year,
+            data_dir=self.data_dir,
+            cache=self.cache,
+            workers=workers,
+            datasets=datasets,
+        )
+        for month, frames in all_data.items():
+            for dataset, df in frames.items():
+                self.put(month, dataset, df)
+        return load_times
+
+    def evict(self, month: str, dataset=None):
+        """Drop one dataset of a month, or every dataset of it, from memory."""
+        for key in list(self._frames):
+            if key[0] == month and dataset in (None, key[1]):
+                self.nbytes -= self._frames.pop(key)[1]
+
+
+class MonthStore(Mapping):
+    """
+    Drop-in replacement for a `{month: DataFrame}` dictionary of one dataset.
+
+    A month is only read the first time it is accessed, and is memoized in the
+    shared FrameCache, so running a single-month insight costs one month of
+    I/O and memory instead of the whole history.
+    """
+
+    def __init__(self, dataset: str, months, frame_cache: FrameCache):
+        if dataset not in DATASETS:
+            raise KeyError(f"Unknown dataset: {dataset}")
+        self.dataset = dataset
+        self.months = list(months)
+        self.frame_cache = frame_cache
+
+    def __getitem__(self, month):
+        if month not in self.months:
+            raise KeyError(month)
+        return self.frame_cache.get(month, self.dataset)
+
+    def __iter__(self):
+        return iter(self.months)
+
+    def __len__(self):
+        return len(self.months)
+
+    def __repr__(self):
+        loaded = [m for m in self.months if (m, self.dataset) in self.frame_cache]
+        return f"MonthStore({self.dataset!r}, months={self.months}, loaded={loaded})"
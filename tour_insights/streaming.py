@@ -0,0 +1,188 @@
+"""Chunked, bounded-memory aggregation of bookings files."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.guides import count_per_guide, day_numbers, guide_day_keys
+from tour_insights.loader import DEFAULT_YEAR, dataset_path
+from tour_insights.schema import SchemaError, iter_with_schema
+from tour_insights.topk import DEFAULT_CAPACITY, SpaceSaving, top_k_indices
+
+# Rows read per chunk when streaming a bookings file
+DEFAULT_CHUNKSIZE = 500_000
+
+# Bit layout of a booked slot key: GuideID << 40 | day << 20 | TourID
+_SLOT_FIELD = 20
+_SLOT_MASK = (1 << _SLOT_FIELD) - 1
+
+# Largest GuideID that fits above the day and TourID fields of a signed 64-bit key
+# (negative ids of unknown guides keep their sign)
+_SLOT_MAX_GUIDE = (1 << (63 - 2 * _SLOT_FIELD)) - 1
+
+# Low 32 bits of a tour-day key: TourID << 32 | day
+_TOUR_DAY_MASK = 0xFFFFFFFF
+
+
+def _check_fields(fields, key: str):
+    """Raise SchemaError when any `(name, values, low, high)` field falls outside its bit range."""
+    for name, values, low, high in fields:
+        if len(values) and (values.min() < low or values.max() > high):
+            raise SchemaError(f"{name} values must lie in {low}..{high} to pack {key}")
+
+
+def slot_keys(guide_ids, days, tour_ids) -> np.ndarray:
+    """
+    Pack (GuideID, day, TourID) into slot keys. Values that do not fit their
+    bit field would silently collide with other slots, so they raise SchemaError.
+    """
+    guide_ids = np.asarray(guide_ids, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    tour_ids = np.asarray(tour_ids, dtype=np.int64)
+    _check_fields(
+        [
+            ("GuideID", guide_ids, -_SLOT_MAX_GUIDE - 1, _SLOT_MAX_GUIDE),
+            ("day", days, 0, _SLOT_MASK),
+            ("TourID", tour_ids, 0, _SLOT_MASK),
+        ],
+        "booked slots",
+    )
+    return (guide_ids << (2 * _SLOT_FIELD)) | (days << _SLOT_FIELD) | tour_ids
+
+
+def tour_day_keys(tour_ids, days) -> np.ndarray:
+    """Pack (TourID, day) into `TourID << 32 | day` keys, raising SchemaError for ids that do not fit."""
+    tour_ids = np.asarray(tour_ids, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    _check_fields([("TourID", tour_ids, 0, (1 << 31) - 1), ("day", days, 0, _TOUR_DAY_MASK)], "tour-day keys")
+    return (tour_ids << 32) | days
+
+
+def _add_dense(total, counts):
+    """Add two id-indexed count arrays of possibly different lengths."""
+    if len(total) < len(counts):
+        total, counts = counts, total
+    total = total.copy()
+    total[: len(counts)] += counts
+    return total
+
+
+def _add_keyed(keys, counts, other_keys, other_counts):
+    """Add two sets of (sorted unique key, count) pairs, returning sorted unique keys."""
+    keys, inverse = np.unique(np.concatenate([keys, other_keys]), return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=np.concatenate([counts, other_counts]), minlength=len(keys))
+    return keys, counts.astype(np.int64)
+
+
+class BookingAggregates:
+    """
+    Mergeable aggregates of a bookings file, enough to draw Insights 1 to 4
+    and 9 without keeping the booking rows in memory:
+
+    - bookings per TourID (Insight 1)
+    - bookings per GuideID (Insight 4)
+    - distinct (GuideID, BookingDate) pairs (Insight 9)
+    - bookings per (GuideID, BookingDate, TourID) slot (minute-level
+      occupancy, skill checks)
+    - bookings per (TourID, BookingDate) (Insights 2 and 3 through the
+      DailyBookingIndex, tour utilization)
+
+    Tour and guide counts are bincount arrays indexed by id. Guide-days are
+    kept as a sorted array of unique packed keys, so merging is a set union.
+    Slots and tour-days are packed keys with a count each. Space-Saving
+    sketches of the most booked tours and guides (`sketch_capacity`
+    counters each) rank them across many months in bounded memory.
+    """
+
+    def __init__(self, sketch_capacity: int = DEFAULT_CAPACITY):
+        self.tour_counts = np.zeros(0, dtype=np.int64)
+        self.guide_counts = np.zeros(0, dtype=np.int64)
+        self.guide_days = np.empty(0, dtype=np.int64)
+        self.slots = np.empty(0, dtype=np.int64)
+        self.slot_counts = np.empty(0, dtype=np.int64)
+        self.tour_day_keys = np.empty(0, dtype=np.int64)
+        self.tour_day_counts = np.empty(0, dtype=np.int64)
+        self.tour_sketch = SpaceSaving(sketch_capacity)
+        self.guide_sketch = SpaceSaving(sketch_capacity)
+
+    @classmethod
+    def from_frame(cls, bookings_df):
+        """Aggregate an already loaded bookings frame in one step."""
+        aggregates = cls()
+        aggregates.update(bookings_df)
+        return aggregates
+
+    def update(self, chunk):
+        """Fold one chunk of booking rows into the aggregates."""
+        guide_ids = chunk["GuideID"].to_numpy()
+        self.tour_counts = _add_dense(self.tour_counts, np.bincount(chunk["TourID"].to_numpy()))
+        self.guide_counts = _add_dense(self.guide_counts, count_per_guide(guide_ids))
+
+        self.guide_days = np.union1d(self.guide_days, guide_day_keys(guide_ids, chunk["BookingDate"]))
+
+        slots = slot_keys(guide_ids, day_numbers(chunk["BookingDate"]), chunk["TourID"].to_numpy())
+        keys, counts = np.unique(slots, return_counts=True)
+        self.slots, self.slot_counts = _add_keyed(self.slots, self.slot_counts, keys, counts)
+
+        tour_days = tour_day_keys(chunk["TourID"].to_numpy(), day_numbers(chunk["BookingDate"]))
+        keys, counts = np.unique(tour_days, return_counts=True)
+        self.tour_day_keys, self.tour_day_counts = _add_keyed(
+            self.tour_day_keys, self.tour_day_counts, keys, counts
+        )
+        self.tour_sketch.update(chunk["TourID"].to_numpy())
+        self.guide_sketch.update(guide_ids[guide_ids >= 0])
+        return self
+
+    def merge(self, other):
+        """Fold the aggregates of another file or month into this one."""
+        self.tour_counts = _add_dense(self.tour_counts, other.tour_counts)
+        self.guide_counts = _add_dense(self.guide_counts, other.guide_counts)
+        self.guide_days = np.union1d(self.guide_days, other.guide_days)
+        self.slots, self.slot_counts = _add_keyed(self.slots, self.slot_counts, other.slots, other.slot_counts)
+        self.tour_day_keys, self.tour_day_counts = _add_keyed(
+            self.tour_day_keys, self.tour_day_counts, other.tour_day_keys, other.tour_day_counts
+        )
+        self.tour_sketch.merge(other.tour_sketch)
+        self.guide_sketch.merge(other.guide_sketch)
+        return self
+
+    def tour_name_counts(self, tours_df, n=None):
+        """Bookings per tour name, most booked first; only the top `n` names when given."""
+        tours = tours_df.drop_duplicates("id")
+        ids = tours["id"].to_numpy()
+        inside = ids < len(self.tour_counts)
+        counts = pd.Series(self.tour_counts[ids[inside]], index=tours["TourName"].to_numpy()[inside])
+        counts = counts.groupby(level=0).sum()
+        top = top_k_indices(counts.to_numpy(), len(counts) if n is None else n)
+        return counts.iloc[top].rename_axis("TourName").rename("count")
+
+    def booked_slots(self):
+        """Return the distinct booked slots as `(guide_ids, day_numbers, tour_ids)` arrays (counts in `slot_counts`)."""
+        return (
+            self.slots >> (2 * _SLOT_FIELD),
+            (self.slots >> _SLOT_FIELD) & _SLOT_MASK,
+            self.slots & _SLOT_MASK,
+        )
+
+    def tour_day_bookings(self):
+        """Return bookings per (TourID, day) as `(tour_ids, day_numbers, counts)` arrays."""
+        return self.tour_day_keys >> 32, self.tour_day_keys & _TOUR_DAY_MASK, self.tour_day_counts
+
+
+def booking_chunks(
+    month: str, year: int = DEFAULT_YEAR, data_dir: str = ".", chunksize: int = DEFAULT_CHUNKSIZE
+):
+    """Yield a month's booking rows in typed chunks of at most `chunksize` rows."""
+    yield from iter_with_schema(dataset_path("bookings", month, year, data_dir), "bookings", chunksize)
+
+
+def stream_bookings(
+    month: str, year: int = DEFAULT_YEAR, data_dir: str = ".", chunksize: int = DEFAULT_CHUNKSIZE
+) -> BookingAggregates:
+    """
+    Aggregate a month's bookings file chunk by chunk. Peak memory is bounded
+    by `chunksize`, not by the size of the file.
+    """
+    aggregates = BookingAggregates()
+    for chunk in booking_chunks(month, year, data_dir, chunksize):
+        aggregates.update(chunk)
+    return aggregates
@@ -0,0 +1,69 @@
+"""Tour time slots encoded as one integer: `TimeStart * 1441 + TimeEnd`."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.weekdays import WEEKDAY_MASK, location_cells
+
+# Minutes in a day
+MINUTES_PER_DAY = 1440
+
+# Distinct minute-of-day values: 0 to 1440, since a tour may end at 24:00
+SLOT_STRIDE = MINUTES_PER_DAY + 1
+
+
+def encode_slots(starts, ends) -> np.ndarray:
+    """Encode (TimeStart, TimeEnd) minute pairs as `start * 1441 + end`."""
+    return np.asarray(starts, dtype=np.int64) * SLOT_STRIDE + np.asarray(ends, dtype=np.int64)
+
+
+def decode_slots(slots):
+    """Return `(starts, ends)` minutes of encoded slots."""
+    return np.divmod(np.asarray(slots, dtype=np.int64), SLOT_STRIDE)
+
+
+def slot_distribution(tours, operating_only: bool = True) -> pd.DataFrame:
+    """
+    Number of tours per time slot of every (month, TourLocation), for all
+    months in one sorted-segment pass over `cell * 1441² + slot` keys. With
+    `operating_only`, tours that operate on no weekday are left out.
+
+    Returns month, TourLocation, TimeSlot, TimeStart, TimeEnd and Count,
+    sorted by month, location and most tours first (earliest slot on ties).
+    """
+    cells, known, n_locations = location_cells(tours)
+    if operating_only:
+        operating = tours[WEEKDAY_MASK].to_numpy()[known] > 0
+        cells, known = cells[operating], np.flatnonzero(known)[operating]
+    slots = encode_slots(tours["TimeStart"].to_numpy()[known], tours["TimeEnd"].to_numpy()[known])
+
+    keys, counts = np.unique(cells * SLOT_STRIDE**2 + slots, return_counts=True)
+    cells, slots = np.divmod(keys, SLOT_STRIDE**2)
+    order = np.lexsort((slots, -counts, cells))
+    cells, slots, counts = cells[order], slots[order], counts[order]
+
+    starts, ends = decode_slots(slots)
+    return pd.DataFrame(
+        {
+            "month": pd.Categorical.from_codes(cells // n_locations, dtype=tours["month"].dtype),
+            "TourLocation": pd.Categorical.from_codes(cells % n_locations, dtype=tours["TourLocation"].dtype),
+            "TimeSlot": slots,
+            "TimeStart": starts,
+            "TimeEnd": ends,
+            "Count": counts,
+        }
+    )
+
+
+def most_common_slots(distribution) -> pd.DataFrame:
+    """
+    The mode of a `slot_distribution` per (month, TourLocation): its first
+    row per location, i.e. the argmax of each location's histogram. Sorted
+    by month and most tours first.
+    """
+    cells = distribution["month"].cat.codes.to_numpy().astype(np.int64) * (
+        len(distribution["TourLocation"].cat.categories)
+    ) + distribution["TourLocation"].cat.codes.to_numpy()
+    first = np.concatenate([[True], cells[1:] != cells[:-1]]) if len(cells) else np.zeros(0, dtype=bool)
+    modes = distribution[first].sort_values(["month", "Count"], ascending=[True, False], kind="stable")
+    return modes.reset_index(drop=True)
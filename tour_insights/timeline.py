@@ -0,0 +1,118 @@
+"""Vectorized arithmetic on minute-of-day ranges keyed by (month, GuideID, day)."""
+
+import numpy as np
+
+# Minute-of-day values are below this bound, so a dense key rank can be packed above them
+_MINUTE_SPAN = 2048
+
+
+def cell_day_keys(month_codes, guide_ids, days, n_ids: int) -> np.ndarray:
+    """Pack (month, GuideID, day number) into one int64 key: `(month * n_ids + GuideID) << 32 | day`."""
+    cells = np.asarray(month_codes, dtype=np.int64) * n_ids + np.asarray(guide_ids, dtype=np.int64)
+    return (cells << 32) | np.asarray(days, dtype=np.int64)
+
+
+def merge_intervals(keys, starts, ends):
+    """
+    Union the overlapping or touching ranges of each key with one sorted
+    sweep. Returns `(keys, starts, ends)` sorted by key and start, with
+    disjoint ranges per key.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    order = np.lexsort((starts, keys))
+    keys = keys[order]
+    starts = np.asarray(starts, dtype=np.int64)[order]
+    ends = np.asarray(ends, dtype=np.int64)[order]
+    if len(keys) == 0:
+        return keys, starts, ends
+
+    # Running maximum of `ends` within each key: packing a dense key rank above
+    # the minutes makes one maximum.accumulate restart at every new key
+    new_key = np.concatenate([[True], keys[1:] != keys[:-1]])
+    rank = np.cumsum(new_key) * _MINUTE_SPAN
+    reach = np.maximum.accumulate(rank + ends) - rank
+
+    new_range = new_key.copy()
+    new_range[1:] |= starts[1:] > reach[:-1]
+    first = np.flatnonzero(new_range)
+    return keys[first], starts[first], np.maximum.reduceat(ends, first)
+
+
+class IntervalIndex:
+    """
+    Disjoint minute ranges per key, sorted by (key, start), so the ranges of
+    any key are found by binary search. Queries pair each range with the
+    ranges of its key only, never with every other range.
+    """
+
+    def __init__(self, keys, starts, ends):
+        self.keys, self.starts, self.ends = merge_intervals(keys, starts, ends)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def minutes(self) -> np.ndarray:
+        """Length in minutes of every indexed range."""
+        return self.ends - self.starts
+
+    def count(self, keys) -> np.ndarray:
+        """Number of indexed ranges of each key."""
+        keys = np.asarray(keys, dtype=np.int64)
+        return np.searchsorted(self.keys, keys, side="right") - np.searchsorted(self.keys, keys, side="left")
+
+    def overlap(self, keys, starts, ends) -> np.ndarray:
+        """Minutes of each query range [start, end) covered by the indexed ranges of its key."""
+        keys = np.asarray(keys, dtype=np.int64)
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        low = np.searchsorted(self.keys, keys, side="left")
+        counts = np.searchsorted(self.keys, keys, side="right") - low
+
+        # One (query, indexed range) pair per range sharing the query's key
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        query = np.repeat(np.arange(len(keys)), counts)
+        indexed = np.repeat(low - offsets[:-1], counts) + np.arange(offsets[-1])
+        covered = np.minimum(ends[query], self.ends[indexed]) - np.maximum(starts[query], self.starts[indexed])
+        return np.bincount(query, weights=np.clip(covered, 0, None), minlength=len(keys)).astype(np.int64)
+
+
+def find_overlaps(keys, starts, ends):
+    """
+    Sweep-line overlap detection. Ranges are sorted by (key, start) and each
+    range is compared with the running maximum end of the earlier ranges of
+    its key, so the cost is one sort, not a pairwise comparison.
+
+    Returns `(rows, blockers, minutes)`: the ranges that start before an
+    earlier range of the same key has ended, the earlier range reaching the
+    furthest, and the overlapping minutes (indices into the inputs).
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    order = np.lexsort((ends, starts, keys))
+    keys, starts, ends = keys[order], starts[order], ends[order]
+    if len(keys) < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+
+    new_key = np.concatenate([[True], keys[1:] != keys[:-1]])
+    rank = np.cumsum(new_key) * _MINUTE_SPAN
+    reach = np.maximum.accumulate(rank + ends) - rank
+
+    # Position of the range holding the running maximum: the last range that set it
+    holder = np.maximum.accumulate(np.where(ends == reach, np.arange(len(keys)), 0))
+
+    later = np.flatnonzero(~new_key[1:] & (starts[1:] < reach[:-1])) + 1
+    blockers = holder[later - 1]
+    minutes = np.minimum(ends[later], reach[later - 1]) - starts[later]
+    return order[later], order[blockers], minutes
+
+
+def minutes_per_cell(keys, minutes, n_months: int, n_ids: int) -> np.ndarray:
+    """Sum minutes of `cell_day_keys` into an (n_months, n_ids) matrix."""
+    cells = np.asarray(keys, dtype=np.int64) >> 32
+    return (
+        np.bincount(cells, weights=minutes, minlength=n_months * n_ids)
+        .astype(np.int64)
+        .reshape(n_months, n_ids)
+    )
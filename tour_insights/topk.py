@@ -0,0 +1,90 @@
+"""Top-k selection: exact over count arrays, or approximate with a mergeable Space-Saving sketch."""
+
+import numpy as np
+
+# Counters kept by a Space-Saving sketch unless configured otherwise
+DEFAULT_CAPACITY = 64
+
+
+def top_k_indices(values, k: int) -> np.ndarray:
+    """
+    Positions of the k largest positive values, largest first and lower
+    position first on ties. Uses argpartition, so only the k selected values
+    are sorted.
+    """
+    values = np.asarray(values)
+    positive = np.flatnonzero(values > 0)
+    if len(positive) > k:
+        # Widen the cut to every value tied with the k-th so ties resolve by position
+        kth = np.partition(values[positive], len(positive) - k)[len(positive) - k]
+        positive = positive[values[positive] >= kth]
+    order = np.lexsort((positive, -values[positive]))
+    return positive[order[:k]]
+
+
+class SpaceSaving:
+    """
+    Bounded-memory heavy-hitter counts of integer items (TourID, GuideID).
+    Keeps at most `capacity` counters. Every item whose true count exceeds
+    `floor` is kept, and a kept item's count overestimates the true count
+    by at most its `error`.
+
+    Sketches merge by adding counts, with the other sketch's floor standing
+    in for an item it does not keep, then keeping the `capacity` largest.
+    A chunk of items is merged in as an exact sketch of the chunk, so
+    updates are vectorized and the state stays O(capacity).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.items = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.errors = np.empty(0, dtype=np.int64)
+        self.floor = 0
+
+    def _truncate(self):
+        """Keep the `capacity` largest counters; dropped counts raise the floor."""
+        if len(self.items) <= self.capacity:
+            return
+        keep = np.argpartition(-self.counts, self.capacity)
+        self.floor = max(self.floor, int(self.counts[keep[self.capacity :]].max()))
+        # Items stay sorted, so other sketches find them by binary search
+        keep = np.sort(keep[: self.capacity])
+        self.items, self.counts, self.errors = self.items[keep], self.counts[keep], self.errors[keep]
+
+    def _lookup(self, items):
+        """Counts and errors of sorted `items`, with the floor for items not kept."""
+        if len(self.items) == 0:
+            floor = np.full(len(items), self.floor, dtype=np.int64)
+            return floor, floor
+        positions = np.minimum(np.searchsorted(self.items, items), len(self.items) - 1)
+        found = self.items[positions] == items
+        return (
+            np.where(found, self.counts[positions], self.floor),
+            np.where(found, self.errors[positions], self.floor),
+        )
+
+    def update(self, items, weights=None):
+        """Count a chunk of items (each weighted by `weights`, default 1)."""
+        items, inverse = np.unique(np.asarray(items, dtype=np.int64), return_inverse=True)
+        chunk = SpaceSaving(self.capacity)
+        chunk.items = items
+        chunk.counts = np.bincount(inverse.ravel(), weights=weights, minlength=len(items)).astype(np.int64)
+        chunk.errors = np.zeros(len(items), dtype=np.int64)
+        chunk._truncate()
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Fold another sketch (e.g. another month) into this one."""
+        items = np.union1d(self.items, other.items)
+        counts, errors = self._lookup(items)
+        other_counts, other_errors = other._lookup(items)
+        self.items, self.counts, self.errors = items, counts + other_counts, errors + other_errors
+        self.floor = self.floor + other.floor
+        self._truncate()
+        return self
+
+    def top(self, k: int):
+        """Return the `(items, counts, errors)` of the k largest counters, largest first."""
+        positions = top_k_indices(self.counts, k)
+        return self.items[positions], self.counts[positions], self.errors[positions]
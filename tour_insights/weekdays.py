@@ -0,0 +1,88 @@
+"""Tour weekday flags packed into one uint8 mask per tour (bit 0 = Monday ... bit 6 = Sunday)."""
+
+import numpy as np
+import pandas as pd
+
+from tour_insights.schema import WEEKDAY_COLUMNS
+
+# Column of the tours dimension holding the packed Op_* flags
+WEEKDAY_MASK = "WeekdayMask"
+
+# Bit of each weekday flag column in a weekday mask
+WEEKDAY_BITS = {column: np.uint8(1 << i) for i, column in enumerate(WEEKDAY_COLUMNS)}
+
+# Number of operating weekdays of every 7-bit mask
+_MASK_POPCOUNT = np.array([bin(i).count("1") for i in range(128)], dtype=np.uint8)
+
+
+def weekday_numbers(days) -> np.ndarray:
+    """Weekday (0 = Monday) of int64 day numbers; day 0, 1970-01-01, was a Thursday."""
+    return (np.asarray(days, dtype=np.int64) + 3) % 7
+
+
+def pack_weekdays(flags) -> np.ndarray:
+    """Pack the Op_Monday ... Op_Sunday flags of a frame into one uint8 mask per row."""
+    flags = np.asarray(flags[WEEKDAY_COLUMNS], dtype=bool)
+    return np.packbits(flags, axis=1, bitorder="little")[:, 0]
+
+
+def operating_weekdays(masks) -> np.ndarray:
+    """Number of weekdays each mask operates, looked up rather than summed."""
+    return _MASK_POPCOUNT[np.asarray(masks, dtype=np.uint8) & 0x7F].astype(np.int64)
+
+
+def location_cells(tours):
+    """
+    Return `(cells, known, n_locations)`: the `month * n_locations + location` code
+    of every tour row with a known TourLocation.
+    """
+    locations = tours["TourLocation"].cat.codes.to_numpy().astype(np.int64)
+    n_locations = len(tours["TourLocation"].cat.categories)
+    cells = tours["month"].cat.codes.to_numpy().astype(np.int64) * n_locations + locations
+    return cells[locations >= 0], locations >= 0, n_locations
+
+
+def _location_frame(tours, cells, values, n_locations, name):
+    """Long (month, TourLocation, value) frame of an (n_months * n_locations) array, observed cells only."""
+    observed = np.unique(cells)
+    return pd.DataFrame(
+        {
+            "month": pd.Categorical.from_codes(
+                observed // n_locations, dtype=tours["month"].dtype
+            ),
+            "TourLocation": pd.Categorical.from_codes(
+                observed % n_locations, dtype=tours["TourLocation"].dtype
+            ),
+            name: values[observed],
+        }
+    )
+
+
+def location_operating_days(tours, name: str = "Tours_Operating_Days") -> pd.DataFrame:
+    """
+    Weekly operating days of all tours of each (month, TourLocation) as one
+    bincount over location codes weighted by each tour's popcount. Sorted by
+    month and most operating days first, like an evaluated InsightSpec.
+    """
+    cells, known, n_locations = location_cells(tours)
+    totals = np.bincount(
+        cells,
+        weights=operating_weekdays(tours[WEEKDAY_MASK].to_numpy()[known]),
+        minlength=len(tours["month"].cat.categories) * n_locations,
+    ).astype(np.int64)
+    result = _location_frame(tours, cells, totals, n_locations, name)
+    return result.sort_values(["month", name], ascending=[True, False], kind="stable").reset_index(drop=True)
+
+
+def location_weekday_masks(tours) -> pd.DataFrame:
+    """Union of the weekday masks of all tours of each (month, TourLocation)."""
+    cells, known, n_locations = location_cells(tours)
+    masks = np.zeros(len(tours["month"].cat.categories) * n_locations, dtype=np.uint8)
+    np.bitwise_or.at(masks, cells, tours[WEEKDAY_MASK].to_numpy()[known])
+    return _location_frame(tours, cells, masks, n_locations, WEEKDAY_MASK)
+
+
+def locations_without(tours, weekday: str) -> pd.DataFrame:
+    """(month, TourLocation) pairs where no tour operates on `weekday`, e.g. "Op_Sunday"."""
+    masks = location_weekday_masks(tours)
+    return masks[(masks[WEEKDAY_MASK] & WEEKDAY_BITS[weekday]) == 0].drop(columns=WEEKDAY_MASK).reset_index(drop=True)